@@ -15,7 +15,7 @@ class ASREngine:
     def __init__(self):
         """Initialize ASR engine."""
         self.mode = "text_input"  # Placeholder mode
-        logger.info(f"ASR initialized in mode: {self.mode}")
+        logger.info("ASR initialized in mode: %s", self.mode)
 
     def transcribe_once(self) -> Optional[str]:
         """
@@ -35,14 +35,14 @@ class ASREngine:
             if text.lower() in ["exit", "quit", "退出", "拜拜"]:
                 return None
 
-            logger.info(f"ASR transcribed: {text}")
+            logger.info("ASR transcribed: %s", text)
             return text
 
         except KeyboardInterrupt:
             logger.info("ASR cancelled by user")
             return None
         except Exception as e:
-            logger.error(f"ASR error: {e}")
+            logger.error("ASR error: %s", e)
             return None
 
     def transcribe_from_audio(self, audio_path: str) -> Optional[str]:
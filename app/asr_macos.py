@@ -1,16 +1,27 @@
 """
 ASR engine using macOS native speech recognition.
-Uses SpeechRecognition library with Google Speech API (free).
+Captures the microphone with sounddevice (PortAudio), gates speech with
+WebRTC VAD and transcribes with a local faster-whisper model (int8, CPU) -
+no calibration pre-roll and no network round-trip per utterance.
 """
 import logging
+import queue
+from collections import deque
 from typing import Optional
-import speech_recognition as sr
 
+from .config import config
 from .utils import logger
 
 
+SAMPLE_RATE = 16000
+FRAME_MS = 30                                   # webrtcvad accepts 10/20/30 ms frames
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000  # 480 samples
+FRAME_BYTES = FRAME_SAMPLES * 2                 # int16 mono
+PRE_ROLL_FRAMES = 10                            # keep 300 ms before speech onset
+
+
 class MacOSASREngine:
-    """ASR engine using SpeechRecognition library."""
+    """ASR engine using PortAudio capture, WebRTC VAD and local Whisper."""
 
     def __init__(self, language="zh-CN"):
         """
@@ -19,16 +30,86 @@ class MacOSASREngine:
         Args:
             language: Language code (zh-CN for Chinese, en-US for English)
         """
+        # 延迟导入重量级依赖 (defer heavy imports until an engine is actually built)
+        import numpy as np
+        import sounddevice as sd
+        import webrtcvad
+        from faster_whisper import WhisperModel
+
+        self._np = np
+        self._sd = sd
+
         self.mode = "macos_speech_recognition"
         self.language = language
-        self.recognizer = sr.Recognizer()
 
-        # 调整识别参数
-        self.recognizer.energy_threshold = 4000  # 提高噪音阈值
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.pause_threshold = 0.8  # 停顿0.8秒视为结束
+        # 识别参数 (VAD instance is reused across utterances)
+        self._vad = webrtcvad.Vad(2)  # 0 (least) - 3 (most aggressive)
+        self.pause_threshold = 0.8  # 停顿0.8秒视为结束
 
-        logger.info(f"ASR initialized in mode: {self.mode}, language: {self.language}")
+        # 本地 Whisper 模型只加载一次 (load the local Whisper model once)
+        # int8 dynamic quantization: CTranslate2 picks AVX2/AVX-512/VNNI kernels itself
+        self.model = WhisperModel(
+            config.ASR_WHISPER_MODEL,
+            device="cpu",
+            compute_type="int8"
+        )
+
+        logger.info("ASR initialized in mode: %s, language: %s", self.mode, self.language)
+
+    def _record_phrase(self, timeout: float, phrase_time_limit: float) -> Optional[bytes]:
+        """
+        Record one phrase from the microphone.
+
+        Args:
+            timeout: Seconds to wait for speech to start
+            phrase_time_limit: Maximum seconds to record
+
+        Returns:
+            16 kHz mono int16 PCM, or None if no speech started in time
+        """
+        frames: queue.Queue = queue.Queue()
+
+        def on_audio(indata, frame_count, time_info, status):
+            frames.put(bytes(indata))
+
+        def is_speech(frame: bytes) -> bool:
+            return len(frame) == FRAME_BYTES and self._vad.is_speech(frame, SAMPLE_RATE)
+
+        wait_frames = int(timeout * 1000 / FRAME_MS)
+        max_frames = int(phrase_time_limit * 1000 / FRAME_MS)
+        silence_frames = int(self.pause_threshold * 1000 / FRAME_MS)
+
+        pre_roll = deque(maxlen=PRE_ROLL_FRAMES)
+        voiced = []
+
+        with self._sd.RawInputStream(
+            samplerate=SAMPLE_RATE,
+            channels=1,
+            dtype="int16",
+            blocksize=FRAME_SAMPLES,
+            callback=on_audio
+        ):
+            # 等待开始说话 (wait for speech onset)
+            logger.debug("Waiting for speech...")
+            for _ in range(wait_frames):
+                frame = frames.get(timeout=1.0)
+                if is_speech(frame):
+                    voiced.extend(pre_roll)
+                    voiced.append(frame)
+                    break
+                pre_roll.append(frame)
+            else:
+                return None
+
+            # 录音直到停顿 (record until a pause or the phrase limit)
+            logger.debug("Listening...")
+            silent = 0
+            while len(voiced) < max_frames and silent < silence_frames:
+                frame = frames.get(timeout=1.0)
+                voiced.append(frame)
+                silent = 0 if is_speech(frame) else silent + 1
+
+        return b"".join(voiced)
 
     def transcribe_once(self, timeout=5, phrase_time_limit=10) -> Optional[str]:
         """
@@ -41,66 +122,50 @@ class MacOSASREngine:
         Returns:
             Transcribed text or None if failed
         """
+        np = self._np
+
         try:
             print(f"\n🎤 请说话（最多 {phrase_time_limit} 秒）...")
 
             # 使用麦克风录音
-            with sr.Microphone() as source:
-                # 调整环境噪音
-                logger.debug("Adjusting for ambient noise...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-
-                # 开始录音
-                logger.debug("Listening...")
-                try:
-                    audio = self.recognizer.listen(
-                        source,
-                        timeout=timeout,
-                        phrase_time_limit=phrase_time_limit
-                    )
-                except sr.WaitTimeoutError:
-                    print("⏱️  超时：未检测到声音")
-                    return None
+            pcm = self._record_phrase(timeout, phrase_time_limit)
+            if pcm is None:
+                print("⏱️  超时：未检测到声音")
+                return None
 
             print("🤖 正在识别...")
 
-            # 使用 Google Speech Recognition（免费）
-            try:
-                text = self.recognizer.recognize_google(
-                    audio,
-                    language=self.language
-                )
-
-                if text:
-                    print(f"✅ 识别结果: {text}")
-                    logger.info(f"ASR transcribed: {text}")
-
-                    # 处理退出命令
-                    if text.lower() in ["退出", "拜拜", "再见", "exit", "quit"]:
-                        return None
-
-                    return text
-                else:
-                    print("⚠️  未识别到内容")
+            # 本地 Whisper 识别 (local Whisper transcription, 16 kHz mono float32)
+            samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+            segments, _ = self.model.transcribe(
+                samples,
+                language=self.language[:2],
+                beam_size=1,
+                vad_filter=True
+            )
+            text = "".join(segment.text for segment in segments).strip()
+
+            if text:
+                print(f"✅ 识别结果: {text}")
+                logger.info("ASR transcribed: %s", text)
+
+                # 处理退出命令
+                if text.lower() in ["退出", "拜拜", "再见", "exit", "quit"]:
                     return None
 
-            except sr.UnknownValueError:
-                print("❌ 无法识别，请重试")
+                return text
+            else:
+                print("⚠️  未识别到内容")
                 logger.warning("Speech recognition could not understand audio")
                 return None
 
-            except sr.RequestError as e:
-                print(f"❌ 识别服务错误: {e}")
-                logger.error(f"Speech recognition service error: {e}")
-                return None
-
         except KeyboardInterrupt:
             print("\n⚠️  已取消")
             logger.info("ASR cancelled by user")
             return None
 
         except Exception as e:
-            logger.error(f"ASR error: {e}")
+            logger.error("ASR error: %s", e)
             print(f"❌ 错误: {e}")
             return None
 
@@ -108,7 +173,11 @@ class MacOSASREngine:
         """测试麦克风是否可用"""
         try:
             print("🎤 测试麦克风...")
-            mic_list = sr.Microphone.list_microphone_names()
+            mic_list = [
+                device["name"]
+                for device in self._sd.query_devices()
+                if device["max_input_channels"] > 0
+            ]
 
             if not mic_list:
                 print("❌ 未找到麦克风设备")
@@ -123,7 +192,7 @@ class MacOSASREngine:
 
         except Exception as e:
             print(f"❌ 麦克风测试失败: {e}")
-            logger.error(f"Microphone test failed: {e}")
+            logger.error("Microphone test failed: %s", e)
             return False
 
 
@@ -1,57 +1,137 @@
 """
-Configuration management using python-dotenv.
-Reads .env file and provides default values.
+Configuration management.
+Reads the .env file once and provides default values.
 """
 import os
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from dotenv import load_dotenv
 
 
 # Load .env from project root
 project_root = Path(__file__).parent.parent
 env_path = project_root / ".env"
-load_dotenv(env_path)
 
 
+def _load_env(path: Path) -> None:
+    """
+    Populate os.environ from a KEY=VALUE file.
+
+    Variables already set in the environment win. Supports blank lines,
+    comments, an optional ``export`` prefix, quoted values and trailing
+    ``# comments`` after unquoted values.
+    """
+    if not path.is_file():
+        return
+
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+
+        key, _, value = line.partition("=")
+        key = key.removeprefix("export ").strip()
+        value = value.strip()
+
+        if value[:1] in ("'", '"'):
+            end = value.find(value[0], 1)
+            value = value[1:end] if end > 0 else value[1:]
+        else:
+            # Inline comment starts at a '#' preceded by whitespace
+            hash_pos = value.find("#")
+            while hash_pos > 0 and not value[hash_pos - 1].isspace():
+                hash_pos = value.find("#", hash_pos + 1)
+            if hash_pos > 0:
+                value = value[:hash_pos].rstrip()
+
+        os.environ.setdefault(key, value)
+
+
+_load_env(env_path)
+
+
+@dataclass(frozen=True)
 class Config:
-    """Global configuration."""
+    """Global configuration. Settings are parsed on first access."""
+
+    # Paths
+    PROJECT_ROOT: Path = project_root
+    PROMPTS_DIR: Path = project_root / "prompts"
+    EXECUTOR_DIR: Path = project_root / "executor"
 
     # Anthropic API
-    ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
-    CLAUDE_MODEL: str = os.getenv(
-        "CLAUDE_MODEL",
-        "claude-3-5-sonnet-20241022"
-    )
+    @cached_property
+    def ANTHROPIC_API_KEY(self) -> str:
+        return os.getenv("ANTHROPIC_API_KEY", "")
+
+    @cached_property
+    def CLAUDE_MODEL(self) -> str:
+        return os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-20241022")
 
     # Language
-    LANG: str = os.getenv("LANG", "zh")
+    @cached_property
+    def LANG(self) -> str:
+        return os.getenv("LANG", "zh")
 
     # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    @cached_property
+    def LOG_LEVEL(self) -> str:
+        return os.getenv("LOG_LEVEL", "INFO")
 
     # Safety
-    CONFIRM_DANGEROUS: bool = os.getenv("CONFIRM_DANGEROUS", "true").lower() == "true"
+    @cached_property
+    def CONFIRM_DANGEROUS(self) -> bool:
+        return os.getenv("CONFIRM_DANGEROUS", "true").lower() == "true"
 
     # LLM settings
-    LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.2"))
-    LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", "1024"))
-    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    @cached_property
+    def LLM_TEMPERATURE(self) -> float:
+        return float(os.getenv("LLM_TEMPERATURE", "0.2"))
+
+    @cached_property
+    def LLM_MAX_TOKENS(self) -> int:
+        return int(os.getenv("LLM_MAX_TOKENS", "1024"))
+
+    @cached_property
+    def LLM_MAX_RETRIES(self) -> int:
+        return int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+    @cached_property
+    def LLM_TIMEOUT_MS(self) -> int:
+        return int(os.getenv("LLM_TIMEOUT_MS", "8000"))  # Deadline before the planner uses rules
+
+    @cached_property
+    def LLM_STREAM_PLAN(self) -> bool:
+        return os.getenv("LLM_STREAM_PLAN", "false").lower() == "true"  # Run plan steps as they stream in
+
+    @cached_property
+    def LLM_DRAFT_MODEL(self) -> str:
+        return os.getenv("LLM_DRAFT_MODEL", "")  # Local GGUF model path; empty disables
 
     # ASR settings
-    ASR_ENGINE: str = os.getenv("ASR_ENGINE", "macos")  # macos, text, whisper
-    ASR_LANGUAGE: str = os.getenv("ASR_LANGUAGE", "zh-CN")  # zh-CN, en-US
-    ASR_TIMEOUT: int = int(os.getenv("ASR_TIMEOUT", "5"))
-    ASR_PHRASE_LIMIT: int = int(os.getenv("ASR_PHRASE_LIMIT", "10"))
+    @cached_property
+    def ASR_ENGINE(self) -> str:
+        return os.getenv("ASR_ENGINE", "macos")  # macos, text, whisper
 
-    # Paths
-    PROJECT_ROOT: Path = project_root
-    PROMPTS_DIR: Path = project_root / "prompts"
-    EXECUTOR_DIR: Path = project_root / "executor"
+    @cached_property
+    def ASR_LANGUAGE(self) -> str:
+        return os.getenv("ASR_LANGUAGE", "zh-CN")  # zh-CN, en-US
+
+    @cached_property
+    def ASR_TIMEOUT(self) -> int:
+        return int(os.getenv("ASR_TIMEOUT", "5"))
+
+    @cached_property
+    def ASR_PHRASE_LIMIT(self) -> int:
+        return int(os.getenv("ASR_PHRASE_LIMIT", "10"))
+
+    @cached_property
+    def ASR_WHISPER_MODEL(self) -> str:
+        return os.getenv("ASR_WHISPER_MODEL", "small")  # tiny, base, small, medium
 
-    @classmethod
-    def validate(cls) -> bool:
+    def validate(self) -> bool:
         """Validate required configuration."""
-        if not cls.ANTHROPIC_API_KEY:
+        if not self.ANTHROPIC_API_KEY:
             return False
         return True
 
@@ -5,15 +5,38 @@ Handles dry-run mode and error recovery.
 import logging
 from pathlib import Path
 from typing import Optional
+from urllib.parse import quote_plus
 
 from .schema import Intent, ExecutionResult
 from .config import config
-from .utils import run_osascript, run_shell_command, logger
+from .utils import OsascriptSession, compile_applescript, run_osascript, run_shell_command, logger
+
+
+# Search URL prefixes; the query is appended URL-encoded
+_GOOGLE_Q = "https://www.google.com/search?q="
+_SEARCH_PROVIDERS = {
+    "google": _GOOGLE_Q,
+    "bing": "https://www.bing.com/search?q=",
+    "baidu": "https://www.baidu.com/s?wd=",
+}
+
+# Actions understood by music.applescript
+_MUSIC_ACTIONS = frozenset({"play", "pause", "next", "previous"})
 
 
 class MacOSExecutor:
     """Execute intents on macOS using AppleScript and shell commands."""
 
+    # Intent name -> handler method name
+    _DISPATCH = {
+        "system_setting": "_execute_system_setting",
+        "web_search": "_execute_web_search",
+        "write_note": "_execute_write_note",
+        "control_app": "_execute_control_app",
+        "play_music": "_execute_play_music",
+        "clarify": "_execute_clarify",
+    }
+
     def __init__(self, dry_run: bool = False):
         """
         Initialize executor.
@@ -23,7 +46,37 @@ class MacOSExecutor:
         """
         self.dry_run = dry_run
         self.scripts_dir = config.EXECUTOR_DIR / "macos"
-        logger.info(f"Executor initialized (dry_run={dry_run})")
+
+        # Scripts are compiled to .scpt once (when stale) so runs skip parsing;
+        # one osascript child runs all of them
+        sources = self.scripts_dir.glob("*.applescript")
+        if dry_run:
+            self._scripts = {path.stem: path for path in sources}
+        else:
+            self._scripts = {path.stem: compile_applescript(path) for path in sources}
+        self._osa = OsascriptSession(self.scripts_dir / "osa_host.js")
+
+        # Bind handlers once so execute() is a single dict lookup
+        self._handlers = {
+            name: getattr(self, method) for name, method in self._DISPATCH.items()
+        }
+        logger.info("Executor initialized (dry_run=%s)", dry_run)
+
+    # Results are built from trusted internal values, so validation is skipped
+    @staticmethod
+    def _ok(message: str, output: str = "") -> ExecutionResult:
+        return ExecutionResult.model_construct(success=True, message=message, output=output, error="")
+
+    @staticmethod
+    def _fail(message: str, error: str = "") -> ExecutionResult:
+        return ExecutionResult.model_construct(success=False, message=message, output="", error=error)
+
+    @staticmethod
+    def _dry(fmt: str, *args) -> ExecutionResult:
+        """Log and return a dry-run result; fmt is a %-style template."""
+        msg = "[DRY RUN] " + fmt % args
+        logger.info(msg)
+        return ExecutionResult.model_construct(success=True, message=msg, output=msg, error="")
 
     def execute(self, intent: Intent) -> ExecutionResult:
         """
@@ -35,39 +88,22 @@ class MacOSExecutor:
         Returns:
             ExecutionResult
         """
-        logger.info(f"Executing intent: {intent.intent}")
+        logger.info("Executing intent: %s", intent.intent)
 
         try:
-            if intent.intent == "system_setting":
-                return self._execute_system_setting(intent)
-            elif intent.intent == "web_search":
-                return self._execute_web_search(intent)
-            elif intent.intent == "write_note":
-                return self._execute_write_note(intent)
-            elif intent.intent == "control_app":
-                return self._execute_control_app(intent)
-            elif intent.intent == "play_music":
-                return self._execute_play_music(intent)
-            elif intent.intent == "clarify":
-                return ExecutionResult(
-                    success=True,
-                    message="Clarification needed",
-                    output=intent.speak_back
-                )
-            else:
-                return ExecutionResult(
-                    success=False,
-                    message=f"Unknown intent: {intent.intent}",
-                    error="Intent not implemented"
-                )
+            handler = self._handlers.get(intent.intent)
+            if handler is not None:
+                return handler(intent)
+
+            return self._fail(f"Unknown intent: {intent.intent}", "Intent not implemented")
 
         except Exception as e:
-            logger.error(f"Execution error: {e}")
-            return ExecutionResult(
-                success=False,
-                message="Execution failed",
-                error=str(e)
-            )
+            logger.error("Execution error: %s", e)
+            return self._fail("Execution failed", str(e))
+
+    def _execute_clarify(self, intent: Intent) -> ExecutionResult:
+        """Nothing to run; the speak_back asks the user to clarify."""
+        return self._ok("Clarification needed", intent.speak_back)
 
     def _execute_system_setting(self, intent: Intent) -> ExecutionResult:
         """Execute system setting changes."""
@@ -77,31 +113,15 @@ class MacOSExecutor:
         if setting == "volume":
             value = slots.get("value", 50)
             if self.dry_run:
-                msg = f"[DRY RUN] Set volume to {value}%"
-                logger.info(msg)
-                return ExecutionResult(success=True, message=msg, output=msg)
+                return self._dry("Set volume to %s%%", value)
 
-            script_path = self.scripts_dir / "system.applescript"
-            success, stdout, stderr = run_osascript(script_path, value)
+            success, stdout, stderr = self._osa.run_file(self._scripts["system"], value)
 
             if success:
-                return ExecutionResult(
-                    success=True,
-                    message=f"Volume set to {value}%",
-                    output=stdout
-                )
-            else:
-                return ExecutionResult(
-                    success=False,
-                    message="Failed to set volume",
-                    error=stderr
-                )
-
-        return ExecutionResult(
-            success=False,
-            message=f"Unknown setting: {setting}",
-            error="Setting not implemented"
-        )
+                return self._ok(f"Volume set to {value}%", stdout)
+            return self._fail("Failed to set volume", stderr)
+
+        return self._fail(f"Unknown setting: {setting}", "Setting not implemented")
 
     def _execute_web_search(self, intent: Intent) -> ExecutionResult:
         """Execute web search."""
@@ -109,35 +129,20 @@ class MacOSExecutor:
         query = slots.get("query", "")
 
         if not query:
-            return ExecutionResult(
-                success=False,
-                message="No query provided",
-                error="Missing query parameter"
-            )
+            return self._fail("No query provided", "Missing query parameter")
 
-        # Use Google search
-        search_url = f"https://www.google.com/search?q={query}"
+        # Google unless the intent names another known provider
+        prefix = _SEARCH_PROVIDERS.get(slots.get("engine", "google"), _GOOGLE_Q)
+        search_url = prefix + quote_plus(query)
 
         if self.dry_run:
-            msg = f"[DRY RUN] Open URL: {search_url}"
-            logger.info(msg)
-            return ExecutionResult(success=True, message=msg, output=msg)
+            return self._dry("Open URL: %s", search_url)
 
-        script_path = self.scripts_dir / "safari.applescript"
-        success, stdout, stderr = run_osascript(script_path, search_url)
+        success, stdout, stderr = self._osa.run_file(self._scripts["safari"], search_url)
 
         if success:
-            return ExecutionResult(
-                success=True,
-                message=f"Opened search for: {query}",
-                output=stdout
-            )
-        else:
-            return ExecutionResult(
-                success=False,
-                message="Failed to open browser",
-                error=stderr
-            )
+            return self._ok(f"Opened search for: {query}", stdout)
+        return self._fail("Failed to open browser", stderr)
 
     def _execute_write_note(self, intent: Intent) -> ExecutionResult:
         """Execute note creation."""
@@ -146,25 +151,13 @@ class MacOSExecutor:
         body = slots.get("body", "")
 
         if self.dry_run:
-            msg = f"[DRY RUN] Create note: title='{title}', body='{body}'"
-            logger.info(msg)
-            return ExecutionResult(success=True, message=msg, output=msg)
+            return self._dry("Create note: title='%s', body='%s'", title, body)
 
-        script_path = self.scripts_dir / "notes.applescript"
-        success, stdout, stderr = run_osascript(script_path, title, body)
+        success, stdout, stderr = self._osa.run_file(self._scripts["notes"], title, body)
 
         if success:
-            return ExecutionResult(
-                success=True,
-                message=f"Note created: {title}",
-                output=stdout
-            )
-        else:
-            return ExecutionResult(
-                success=False,
-                message="Failed to create note",
-                error=stderr
-            )
+            return self._ok(f"Note created: {title}", stdout)
+        return self._fail("Failed to create note", stderr)
 
     def _execute_control_app(self, intent: Intent) -> ExecutionResult:
         """Execute app control."""
@@ -173,50 +166,28 @@ class MacOSExecutor:
         action = slots.get("action", "open")
 
         if not app:
-            return ExecutionResult(
-                success=False,
-                message="No app specified",
-                error="Missing app parameter"
-            )
+            return self._fail("No app specified", "Missing app parameter")
 
         if action == "open" or action == "open_url":
             # If URL is provided, use Safari script
             url = slots.get("url", "")
             if url:
                 if self.dry_run:
-                    msg = f"[DRY RUN] Open URL in {app}: {url}"
-                    logger.info(msg)
-                    return ExecutionResult(success=True, message=msg, output=msg)
+                    return self._dry("Open URL in %s: %s", app, url)
 
-                script_path = self.scripts_dir / "safari.applescript"
-                success, stdout, stderr = run_osascript(script_path, url)
+                success, stdout, stderr = self._osa.run_file(self._scripts["safari"], url)
             else:
                 # Just open the app
                 if self.dry_run:
-                    msg = f"[DRY RUN] Open app: {app}"
-                    logger.info(msg)
-                    return ExecutionResult(success=True, message=msg, output=msg)
+                    return self._dry("Open app: %s", app)
 
-                success, stdout, stderr = run_shell_command(f"open -a '{app}'")
+                success, stdout, stderr = run_shell_command(["open", "-a", app])
 
             if success:
-                return ExecutionResult(
-                    success=True,
-                    message=f"Opened {app}",
-                    output=stdout
-                )
-            else:
-                return ExecutionResult(
-                    success=False,
-                    message=f"Failed to open {app}",
-                    error=stderr
-                )
-
-        return ExecutionResult(
-            success=False,
-            message=f"Unknown action: {action}",
-            error="Action not implemented"
-        )
+                return self._ok(f"Opened {app}", stdout)
+            return self._fail(f"Failed to open {app}", stderr)
+
+        return self._fail(f"Unknown action: {action}", "Action not implemented")
 
     def _execute_play_music(self, intent: Intent) -> ExecutionResult:
         """Execute music playback control."""
@@ -224,40 +195,22 @@ class MacOSExecutor:
         action = slots.get("action", "play")
 
         if self.dry_run:
-            msg = f"[DRY RUN] Music action: {action}"
-            logger.info(msg)
-            return ExecutionResult(success=True, message=msg, output=msg)
-
-        # Use osascript to control Music app
-        if action == "play":
-            cmd = 'osascript -e \'tell application "Music" to play\''
-        elif action == "pause":
-            cmd = 'osascript -e \'tell application "Music" to pause\''
-        elif action == "next":
-            cmd = 'osascript -e \'tell application "Music" to next track\''
-        elif action == "previous":
-            cmd = 'osascript -e \'tell application "Music" to previous track\''
-        else:
-            return ExecutionResult(
-                success=False,
-                message=f"Unknown music action: {action}",
-                error="Action not supported"
-            )
+            return self._dry("Music action: %s", action)
 
-        success, stdout, stderr = run_shell_command(cmd)
+        # Control Music app through the shared osascript session
+        if action not in _MUSIC_ACTIONS:
+            return self._fail(f"Unknown music action: {action}", "Action not supported")
+
+        success, stdout, stderr = self._osa.run_file(self._scripts["music"], action)
+        if not success and self._osa.unavailable:
+            # Session could not run the script (not after a timeout, which
+            # may have played already): fall back to a one-shot osascript
+            logger.warning("osascript session unavailable, running music script directly")
+            success, stdout, stderr = run_osascript(self._scripts["music"], action)
 
         if success:
-            return ExecutionResult(
-                success=True,
-                message=f"Music {action} executed",
-                output=stdout
-            )
-        else:
-            return ExecutionResult(
-                success=False,
-                message=f"Failed to {action} music",
-                error=stderr
-            )
+            return self._ok(f"Music {action} executed", stdout)
+        return self._fail(f"Failed to {action} music", stderr)
 
 
 def create_executor(dry_run: bool = False) -> MacOSExecutor:
@@ -3,16 +3,207 @@ LLM client for Anthropic Claude API.
 Only produces JSON output, with retry on failure.
 支持单步 Intent 和多步 Plan。(Supports single-step Intent and multi-step Plan)
 """
+import importlib.util
 import json
+import mmap
 import logging
-from typing import Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
-import anthropic
 from pydantic import ValidationError
 
 from .config import config
-from .schema import Intent, Plan
-from .utils import logger
+from .schema import INTENT_ADAPTER, PLAN_ADAPTER, VALID_INTENTS, Intent, Plan, parse_intent_json
+from .llm_local import create_draft_llm
+from .utils import json_dumps, json_loads, logger
+
+
+# Tail of every per-turn user message; the head (few-shot block) is built once
+_USER_MESSAGE_SUFFIX = "\n\nOutput only JSON:"
+
+
+class _JsonObjectScanner:
+    """
+    Incremental scanner that finds the first balanced top-level JSON object.
+
+    Tracks brace depth outside string literals (honouring escapes), so it can
+    be fed streamed text chunk by chunk without re-scanning the prefix.
+    """
+
+    def __init__(self):
+        self._parts: list[str] = []
+        self._offset = 0        # absolute index of the next char to scan
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start = -1
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Consume a chunk of text.
+
+        Returns:
+            The complete JSON object text once its closing brace arrives,
+            otherwise None
+        """
+        self._parts.append(chunk)
+        for i, ch in enumerate(chunk, self._offset):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                if self._depth:
+                    self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif ch == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    return "".join(self._parts)[self._start:i + 1]
+        self._offset += len(chunk)
+        return None
+
+
+class _PlanStepScanner:
+    """
+    Incrementally find plan steps in a streamed JSON response.
+
+    A step is an object directly inside an array of the top-level object
+    (the "plan" list). Each feed() returns the ("step", text) pairs completed
+    by that chunk, followed by ("done", text) once the top-level object closes.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._stack: List[str] = []  # open '{' / '[' of the top-level object
+        self._in_string = False
+        self._escape = False
+        self._start = -1
+        self._step_start = -1
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        found = []
+        offset = len(self._text)
+        self._text += chunk
+        for i, ch in enumerate(chunk, offset):
+            if self.done:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                if self._stack:
+                    self._in_string = True
+            elif ch in "{[":
+                if not self._stack:
+                    if ch != "{":
+                        continue
+                    self._start = i
+                elif ch == "{" and self._stack == ["{", "["]:
+                    self._step_start = i
+                self._stack.append(ch)
+            elif ch in "}]" and self._stack:
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                    found.append(("done", self._text[self._start:i + 1]))
+                elif ch == "}" and self._stack == ["{", "["]:
+                    found.append(("step", self._text[self._step_start:i + 1]))
+        return found
+
+
+def _scan_json(text: str) -> Optional[str]:
+    """Return the first balanced top-level JSON object in text, if any."""
+    return _JsonObjectScanner().feed(text)
+
+
+def _read_prompt(path) -> Optional[str]:
+    """Read a UTF-8 prompt file as bytes and decode it once, or None if missing."""
+    try:
+        with open(path, "rb") as f:
+            return f.read().strip().decode("utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def _iter_jsonl(path):
+    """
+    Yield parsed objects from a JSONL file.
+
+    The file is memory-mapped and split on b"\n" offsets, so no list of
+    lines is built.
+    """
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            size = len(mm)
+            while start < size:
+                end = mm.find(b"\n", start)
+                if end < 0:
+                    end = size
+                line = mm[start:end].strip()
+                if line:
+                    yield json_loads(line)
+                start = end + 1
+
+
+_INTENT_FIELDS = tuple(Intent.model_fields)
+
+# Draft intents that are always re-checked by Claude (low confidence)
+_DRAFT_ESCALATE = frozenset({"clarify"})
+
+
+def _build_intent(data: dict) -> Intent:
+    """
+    Build an Intent from parsed LLM JSON.
+
+    The prompt constrains the shape, so the common well-formed case is built
+    with model_construct; anything else gets full Pydantic validation.
+
+    Raises:
+        ValidationError: If the data does not match the schema
+    """
+    intent = data.get("intent")
+    if (
+        isinstance(intent, str)
+        and intent in VALID_INTENTS
+        and isinstance(data.get("slots", {}), dict)
+        and isinstance(data.get("confirm", False), bool)
+        and isinstance(data.get("speak_back", ""), str)
+        and isinstance(data.get("safety", {}), dict)
+    ):
+        return Intent.model_construct(**{k: data[k] for k in _INTENT_FIELDS if k in data})
+    return INTENT_ADAPTER.validate_python(data)
+
+
+def _build_plan(data: dict) -> Plan:
+    """
+    Build a Plan from parsed LLM JSON (same fast path as _build_intent).
+
+    Raises:
+        ValidationError: If the data does not match the schema
+    """
+    steps = data.get("plan")
+    summary = data.get("summary", "")
+    if (
+        isinstance(steps, list)
+        and all(isinstance(step, dict) for step in steps)
+        and isinstance(summary, str)
+    ):
+        return Plan.model_construct(plan=[_build_intent(step) for step in steps], summary=summary)
+    return PLAN_ADAPTER.validate_python(data)
 
 
 class LLMClient:
@@ -22,16 +213,142 @@ class LLMClient:
         if not config.ANTHROPIC_API_KEY:
             raise ValueError("ANTHROPIC_API_KEY not set in environment")
 
-        self.client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+        import anthropic  # deferred: only needed once an LLM client is built
+
+        # One pooled keep-alive client for the whole session: consecutive turns
+        # reuse the TCP+TLS connection (HTTP/2 when the optional h2 package is present)
+        self.client = anthropic.Anthropic(
+            api_key=config.ANTHROPIC_API_KEY,
+            timeout=30.0,
+            http_client=anthropic.DefaultHttpxClient(
+                http2=importlib.util.find_spec("h2") is not None
+            ),
+        )
         self.model = config.CLAUDE_MODEL
         self.temperature = config.LLM_TEMPERATURE
         self.max_tokens = config.LLM_MAX_TOKENS
 
+        # Prompt files do not change at runtime: read and format them once
+        self._system_prompt = self._load_system_prompt()
+        self._plan_system_prompt = self._load_plan_system_prompt()
+        self._fewshot = self._load_fewshot_examples()
+        self._user_message_prefix = f"{self._fewshot}\n\nNow parse this user request:\nUser: "
+
+        # Optional on-device draft model, tried before Claude for single intents
+        self._draft = create_draft_llm()
+
+        # API errors worth a retry; anything else (bad key, bad request) raises
+        self._recoverable = (
+            anthropic.APIConnectionError,  # includes timeouts
+            anthropic.RateLimitError,
+            anthropic.InternalServerError,
+        )
+
+    def _build_user_message(self, text: str) -> str:
+        """Build the per-turn user message on top of the cached few-shot prefix."""
+        return self._user_message_prefix + text + _USER_MESSAGE_SUFFIX
+
+    def _complete(self, system_prompt: str, user_message: str) -> str:
+        """
+        Stream a completion and return its text.
+
+        Reading stops as soon as the first balanced JSON object has arrived,
+        so latency is "first complete object" rather than "full completion".
+
+        Args:
+            system_prompt: System prompt
+            user_message: User message content
+
+        Returns:
+            Response text received so far
+        """
+        chunks = []
+        scanner = _JsonObjectScanner()
+
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": user_message}
+            ]
+        ) as stream:
+            for delta in stream.text_stream:
+                chunks.append(delta)
+                if scanner.feed(delta) is not None:
+                    break  # leaving the context manager closes the stream
+
+        return "".join(chunks)
+
+    def warmup(self) -> None:
+        """
+        Open the pooled API connection with a minimal 1-token request.
+
+        Failures are only logged: the first real call retries on its own.
+        """
+        try:
+            self.client.messages.create(
+                model=self.model,
+                max_tokens=1,
+                messages=[{"role": "user", "content": "ping"}]
+            )
+            logger.debug("LLM connection warmed up")
+        except Exception as e:
+            logger.warning("LLM warmup failed: %s", e)
+
+    def stream_plan(self, text: str) -> Iterator[Intent]:
+        """
+        流式解析多步 Plan，每个步骤完成即返回。
+        (Stream a multi-step Plan, yielding each step as soon as it is complete)
+
+        A single-intent answer is yielded as one step. There are no retries:
+        steps may already have been acted on.
+
+        Args:
+            text: User utterance
+
+        Yields:
+            Intent for each plan step
+
+        Raises:
+            ValueError: If the response contains no JSON object
+            ValidationError: If a step does not match the schema
+        """
+        scanner = _PlanStepScanner()
+        steps = 0
+
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            system=self._plan_system_prompt,
+            messages=[
+                {"role": "user", "content": self._build_user_message(text)}
+            ]
+        ) as stream:
+            for delta in stream.text_stream:
+                for kind, obj_text in scanner.feed(delta):
+                    if kind == "step":
+                        steps += 1
+                        yield _build_intent(json_loads(obj_text))
+                    elif steps == 0:
+                        parsed = json_loads(obj_text)
+                        if "plan" not in parsed:
+                            yield _build_intent(parsed)
+                            steps = 1
+                if scanner.done:
+                    break  # leaving the context manager closes the stream
+
+        if steps == 0:
+            raise ValueError("No JSON object in LLM plan response")
+        logger.info("Streamed Plan with %d steps", steps)
+
     def _load_system_prompt(self) -> str:
         """Load system prompt from file."""
-        prompt_path = config.PROMPTS_DIR / "system.txt"
-        if prompt_path.exists():
-            return prompt_path.read_text(encoding="utf-8").strip()
+        prompt = _read_prompt(config.PROMPTS_DIR / "system.txt")
+        if prompt is not None:
+            return prompt
         return self._default_system_prompt()
 
     def _default_system_prompt(self) -> str:
@@ -60,15 +377,10 @@ Rules:
         if not fewshot_path.exists():
             return ""
 
-        examples = []
         try:
-            with open(fewshot_path, encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        examples.append(json.loads(line))
+            examples = list(_iter_jsonl(fewshot_path))
         except Exception as e:
-            logger.warning(f"Failed to load few-shot examples: {e}")
+            logger.warning("Failed to load few-shot examples: %s", e)
             return ""
 
         if not examples:
@@ -78,11 +390,11 @@ Rules:
         formatted = "\n\nExamples:\n"
         for ex in examples:
             formatted += f"\nUser: {ex.get('user', '')}\n"
-            formatted += f"Assistant: {json.dumps(ex.get('assistant', {}), ensure_ascii=False)}\n"
+            formatted += f"Assistant: {json_dumps(ex.get('assistant', {}))}\n"
 
         return formatted
 
-    def call_llm_to_intent(self, text: str) -> Intent:
+    def call_llm_to_intent(self, text: str) -> Optional[Intent]:
         """
         Call LLM to parse user text into Intent.
 
@@ -90,44 +402,35 @@ Rules:
             text: User utterance
 
         Returns:
-            Intent object
+            Intent object, or None if every attempt hit a recoverable failure
+            (invalid output, connection error, rate limit, server error)
 
         Raises:
-            ValueError: If all retries fail
+            anthropic.APIError: On non-recoverable API errors (e.g. authentication)
         """
-        system_prompt = self._load_system_prompt()
-        fewshot = self._load_fewshot_examples()
+        system_prompt = self._system_prompt
 
-        user_message = f"{fewshot}\n\nNow parse this user request:\nUser: {text}\n\nOutput only JSON:"
+        if self._draft is not None:
+            intent = self._draft_intent(text)
+            if intent is not None:
+                return intent
+
+        user_message = self._build_user_message(text)
 
         for attempt in range(config.LLM_MAX_RETRIES):
             try:
-                logger.info(f"LLM call attempt {attempt + 1}/{config.LLM_MAX_RETRIES}")
-
-                message = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    system=system_prompt,
-                    messages=[
-                        {"role": "user", "content": user_message}
-                    ]
-                )
-
-                # Extract text content
-                response_text = ""
-                for block in message.content:
-                    if block.type == "text":
-                        response_text += block.text
-
-                logger.debug(f"LLM response: {response_text}")
+                logger.info("LLM call attempt %d/%d", attempt + 1, config.LLM_MAX_RETRIES)
+
+                response_text = self._complete(system_prompt, user_message)
+
+                logger.debug("LLM response: %s", response_text)
 
                 # Try to parse JSON
                 parsed = self._extract_json(response_text)
                 if parsed:
                     # Validate with Pydantic
-                    intent = Intent(**parsed)
-                    logger.info(f"Successfully parsed intent: {intent.intent}")
+                    intent = _build_intent(parsed)
+                    logger.info("Successfully parsed intent: %s", intent.intent)
                     return intent
 
                 # If first attempt failed, retry with correction prompt
@@ -136,20 +439,43 @@ Rules:
                     continue
 
             except ValidationError as e:
-                logger.error(f"Pydantic validation failed: {e}")
-            except Exception as e:
-                logger.error(f"LLM call failed: {e}")
-
-        # All retries failed, return clarify intent
-        logger.warning("All LLM retries failed, returning clarify intent")
-        return Intent(
-            intent="clarify",
-            confirm=True,
-            speak_back="抱歉，我没理解您的意思，能再说一遍吗？",
-            safety={"risk": "low", "reason": "LLM parsing failed"}
-        )
+                logger.error("Pydantic validation failed: %s", e)
+            except self._recoverable as e:
+                logger.error("LLM call failed: %s", e)
+
+        # All retries failed: the caller decides the fallback
+        logger.warning("All LLM retries failed")
+        return None
 
-    def call_llm_to_plan(self, text: str) -> Union[Intent, Plan]:
+    def _draft_intent(self, text: str) -> Optional[Intent]:
+        """
+        Parse text with the local draft model.
+
+        Returns:
+            The draft Intent, or None if it failed validation or should be
+            escalated to Claude (clarify, or control_app with a URL)
+        """
+        try:
+            # The grammar makes the whole output one Intent object: validate
+            # the raw text directly, without a separate json parse
+            intent = parse_intent_json(self._draft.complete(self._system_prompt, text))
+        except ValidationError as e:
+            logger.info("Draft intent failed validation: %s", e)
+            return None
+        except Exception as e:
+            logger.warning("Local draft model failed: %s", e)
+            return None
+
+        if intent.intent in _DRAFT_ESCALATE or (
+            intent.intent == "control_app" and intent.slots.get("url")
+        ):
+            logger.info("Escalating draft intent to Claude: %s", intent.intent)
+            return None
+
+        logger.info("Using local draft intent: %s", intent.intent)
+        return intent
+
+    def call_llm_to_plan(self, text: str) -> Optional[Union[Intent, Plan]]:
         """
         调用 LLM 解析用户输入，返回单步 Intent 或多步 Plan。
         (Call LLM to parse user text into either Intent or Plan)
@@ -158,37 +484,22 @@ Rules:
             text: User utterance
 
         Returns:
-            Union[Intent, Plan]: Either a single Intent or a Plan with multiple Intents
+            Either a single Intent or a Plan with multiple Intents, or None if
+            every attempt hit a recoverable failure
 
         Raises:
-            ValueError: If all retries fail
+            anthropic.APIError: On non-recoverable API errors (e.g. authentication)
         """
-        system_prompt = self._load_plan_system_prompt()
-        fewshot = self._load_fewshot_examples()
-
-        user_message = f"{fewshot}\n\nNow parse this user request:\nUser: {text}\n\nOutput only JSON:"
+        system_prompt = self._plan_system_prompt
+        user_message = self._build_user_message(text)
 
         for attempt in range(config.LLM_MAX_RETRIES):
             try:
-                logger.info(f"LLM plan call attempt {attempt + 1}/{config.LLM_MAX_RETRIES}")
-
-                message = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    system=system_prompt,
-                    messages=[
-                        {"role": "user", "content": user_message}
-                    ]
-                )
-
-                # Extract text content
-                response_text = ""
-                for block in message.content:
-                    if block.type == "text":
-                        response_text += block.text
-
-                logger.debug(f"LLM response: {response_text}")
+                logger.info("LLM plan call attempt %d/%d", attempt + 1, config.LLM_MAX_RETRIES)
+
+                response_text = self._complete(system_prompt, user_message)
+
+                logger.debug("LLM response: %s", response_text)
 
                 # Try to parse JSON
                 parsed = self._extract_json(response_text)
@@ -196,44 +507,39 @@ Rules:
                     # Try Plan first (has "plan" key), then Intent
                     if "plan" in parsed:
                         try:
-                            plan = Plan(**parsed)
-                            logger.info(f"Successfully parsed Plan with {len(plan.plan)} steps")
+                            plan = _build_plan(parsed)
+                            logger.info("Successfully parsed Plan with %d steps", len(plan.plan))
                             return plan
                         except ValidationError as e:
-                            logger.error(f"Plan validation failed: {e}")
+                            logger.error("Plan validation failed: %s", e)
                     else:
                         try:
-                            intent = Intent(**parsed)
-                            logger.info(f"Successfully parsed single Intent: {intent.intent}")
+                            intent = _build_intent(parsed)
+                            logger.info("Successfully parsed single Intent: %s", intent.intent)
                             return intent
                         except ValidationError as e:
-                            logger.error(f"Intent validation failed: {e}")
+                            logger.error("Intent validation failed: %s", e)
 
                 # If first attempt failed, retry with correction prompt
                 if attempt == 0:
                     user_message = f"The previous output was invalid. Please output ONLY valid JSON matching the schema. User request: {text}"
                     continue
 
-            except Exception as e:
-                logger.error(f"LLM call failed: {e}")
+            except self._recoverable as e:
+                logger.error("LLM call failed: %s", e)
 
-        # All retries failed, return clarify intent
-        logger.warning("All LLM retries failed, returning clarify intent")
-        return Intent(
-            intent="clarify",
-            confirm=True,
-            speak_back="抱歉，我没理解您的意思，能再说一遍吗？",
-            safety={"risk": "low", "reason": "LLM parsing failed"}
-        )
+        # All retries failed: the caller decides the fallback
+        logger.warning("All LLM retries failed")
+        return None
 
     def _load_plan_system_prompt(self) -> str:
         """
         加载支持多步骤规划的 system prompt。
         (Load system prompt that supports multi-step planning)
         """
-        prompt_path = config.PROMPTS_DIR / "system_plan.txt"
-        if prompt_path.exists():
-            return prompt_path.read_text(encoding="utf-8").strip()
+        prompt = _read_prompt(config.PROMPTS_DIR / "system_plan.txt")
+        if prompt is not None:
+            return prompt
 
         # Fallback to default multi-step prompt
         return """You are a Command Planner for a macOS voice assistant.
@@ -267,32 +573,20 @@ Rules:
 6. summary explains the overall plan in one sentence"""
 
     def _extract_json(self, text: str) -> Optional[dict]:
-        """Extract JSON from response text."""
-        # Remove markdown code blocks
-        text = text.strip()
-        if text.startswith("```"):
-            # Find the JSON content between ```
-            lines = text.split("\n")
-            json_lines = []
-            in_code = False
-            for line in lines:
-                if line.strip().startswith("```"):
-                    in_code = not in_code
-                    continue
-                if in_code or not line.strip().startswith("```"):
-                    json_lines.append(line)
-            text = "\n".join(json_lines)
+        """
+        Extract the first JSON object from response text.
+
+        Markdown fences and surrounding prose need no special handling: the
+        scan starts at the first '{' and stops at its matching '}'.
+        """
+        json_str = _scan_json(text)
+        if json_str is None:
+            return None
 
-        # Try to parse
         try:
-            # Find JSON object
-            start = text.find("{")
-            end = text.rfind("}") + 1
-            if start >= 0 and end > start:
-                json_str = text[start:end]
-                return json.loads(json_str)
+            return json_loads(json_str)
         except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing failed: {e}")
+            logger.error("JSON parsing failed: %s", e)
 
         return None
 
@@ -0,0 +1,100 @@
+"""
+Optional local draft model for intent parsing.
+Runs a small quantized GGUF model through llama.cpp with a JSON grammar, so
+short commands can be answered on-device before falling back to Claude.
+Disabled unless LLM_DRAFT_MODEL points at a model file.
+"""
+import importlib.util
+import os
+from pathlib import Path
+from typing import Optional, get_args
+
+from .config import config
+from .schema import IntentName
+from .utils import logger
+
+
+_INTENT_CHOICES = " | ".join(f'"\\"{name}\\""' for name in get_args(IntentName))
+
+# GBNF grammar forcing the exact Intent shape (see prompts/system.txt)
+INTENT_GRAMMAR = r'''
+root    ::= "{" ws "\"intent\"" ws ":" ws intent ws "," ws "\"slots\"" ws ":" ws slots ws "," ws "\"confirm\"" ws ":" ws boolean ws "," ws "\"speak_back\"" ws ":" ws string ws "," ws "\"safety\"" ws ":" ws safety ws "}"
+intent  ::= ''' + _INTENT_CHOICES + r'''
+slots   ::= "{" ws ( string ws ":" ws value ( ws "," ws string ws ":" ws value )* )? ws "}"
+safety  ::= "{" ws "\"risk\"" ws ":" ws risk ws "," ws "\"reason\"" ws ":" ws string ws "}"
+risk    ::= "\"low\"" | "\"medium\"" | "\"high\""
+value   ::= string | number | boolean | "null"
+string  ::= "\"" ( [^"\\\x00-\x1F] | "\\" ( ["\\/bfnrt] | "u" [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F] ) )* "\""
+number  ::= "-"? [0-9]+ ( "." [0-9]+ )?
+boolean ::= "true" | "false"
+ws      ::= [ \t\n]*
+'''
+
+
+class LocalDraftLLM:
+    """Small on-device model that drafts Intent JSON under a grammar."""
+
+    def __init__(self, model_path: str, n_ctx: int = 1024):
+        """
+        Initialize local draft model.
+
+        Args:
+            model_path: Path to a GGUF model (e.g. qwen2.5-0.5b-instruct-q4_k_m.gguf)
+            n_ctx: Context window in tokens
+        """
+        from llama_cpp import Llama, LlamaGrammar
+
+        self.model_path = model_path
+        self.llm = Llama(
+            model_path=model_path,
+            n_ctx=n_ctx,
+            n_threads=os.cpu_count(),
+            verbose=False
+        )
+        self._grammar = LlamaGrammar.from_string(INTENT_GRAMMAR, verbose=False)
+
+        logger.info("Local draft model loaded: %s", Path(model_path).name)
+
+    def complete(self, system_prompt: str, user_message: str) -> str:
+        """
+        Generate grammar-constrained Intent JSON.
+
+        Args:
+            system_prompt: System prompt
+            user_message: User utterance
+
+        Returns:
+            Model output text
+        """
+        response = self.llm.create_chat_completion(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message},
+            ],
+            grammar=self._grammar,
+            temperature=0.0,
+            max_tokens=256
+        )
+        return response["choices"][0]["message"]["content"] or ""
+
+
+def create_draft_llm() -> Optional[LocalDraftLLM]:
+    """
+    Factory function to create the local draft model.
+
+    Returns:
+        LocalDraftLLM, or None if not configured or unavailable
+    """
+    model_path = config.LLM_DRAFT_MODEL
+    if not model_path:
+        return None
+
+    if importlib.util.find_spec("llama_cpp") is None:
+        logger.warning("LLM_DRAFT_MODEL is set but llama-cpp-python is not installed")
+        return None
+
+    try:
+        return LocalDraftLLM(model_path)
+    except Exception as e:
+        logger.warning("Failed to load local draft model: %s", e)
+        return None
@@ -4,30 +4,92 @@ Voice-activated macOS assistant CLI.
 Main entry point for the application.
 支持单步 Intent 和多步 Plan 执行。(Supports single-step Intent and multi-step Plan execution)
 """
+import importlib
 import sys
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
 import typer
 from rich.console import Console
-from rich.panel import Panel
-from rich import print as rprint
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.config import config
 from app.schema import Intent, Plan
-from app.planner import create_planner
-from app.executor import create_executor
-from app.tts import create_tts_engine
-from app.verbalizer import create_verbalizer
 from app.utils import logger
 
 
 app = typer.Typer(help="Voice-activated macOS assistant")
 console = Console()
 
+# Per-turn output bypasses rich: pre-formatted templates, one write each.
+# When stdout is not a terminal the intent/plan echo and progress markers are
+# skipped (a log line is written instead); errors and results always print.
+_IS_TTY = sys.stdout.isatty()
+
+
+def _ansi(code: str) -> str:
+    return f"\x1b[{code}m" if _IS_TTY else ""
+
+
+_BOLD, _DIM, _RESET = _ansi("1"), _ansi("2"), _ansi("0")
+_RED, _GREEN, _YELLOW, _CYAN = _ansi("31"), _ansi("32"), _ansi("33"), _ansi("36")
+
+PLANNING_MSG = f"\n{_CYAN}📝 Planning...{_RESET}\n"
+EXECUTING_MSG = f"\n{_CYAN}⚙️  Executing...{_RESET}\n"
+ERROR_TMPL = f"{_BOLD}{_RED}Error:{_RESET} {{}}\n"
+DRY_RUN_TMPL = f"\n{_YELLOW}{{}}{_RESET}\n"
+INTENT_TMPL = (
+    f"{_GREEN}┌─ 🎯 Parsed Intent ─────────────────{_RESET}\n"
+    f"{_GREEN}│{_RESET} {_BOLD}Intent:{_RESET} {{intent}}\n"
+    f"{_GREEN}│{_RESET} {_BOLD}Slots:{_RESET} {{slots}}\n"
+    f"{_GREEN}│{_RESET} {_BOLD}Confirm:{_RESET} {{confirm}}\n"
+    f"{_GREEN}│{_RESET} {_BOLD}Safety:{_RESET} {{safety}}\n"
+    f"{_GREEN}└────────────────────────────────────{_RESET}\n"
+)
+SUCCESS_TMPL = (
+    f"{_GREEN}┌────────────────────────────────────{_RESET}\n"
+    f"{_GREEN}│{_RESET} {_BOLD}{_GREEN}✓ Success{_RESET}\n"
+    f"{_GREEN}│{_RESET} {{message}}\n"
+    f"{_GREEN}└────────────────────────────────────{_RESET}\n"
+)
+FAILURE_TMPL = (
+    f"{_RED}┌────────────────────────────────────{_RESET}\n"
+    f"{_RED}│{_RESET} {_BOLD}{_RED}✗ Failed{_RESET}\n"
+    f"{_RED}│{_RESET} {{message}}\n"
+    f"{_RED}│{_RESET} {_DIM}{{error}}{_RESET}\n"
+    f"{_RED}└────────────────────────────────────{_RESET}\n"
+)
+STEP_TMPL = f"{_CYAN}📍 Step {{label}}: {{intent}}{_RESET}\n"
+
+# Plan table row: (step, intent, slots markup, status markup)
+StepRow = Tuple[int, str, str, str]
+
+
+def _echo(text: str) -> None:
+    """Write pre-formatted turn output to stdout."""
+    sys.stdout.write(text)
+
+
+def _print(*objects) -> None:
+    """Print decorative rich markup/renderables (terminal only)."""
+    if _IS_TTY:
+        console.print(*objects)
+
+
+# Planner, executor, TTS and verbalizer are imported on first use, so commands
+# that never build them do not pay for their imports
+_cached_modules: dict = {}
+
+
+def _module(name: str):
+    """Import app.<name> once and memoize it."""
+    module = _cached_modules.get(name)
+    if module is None:
+        module = _cached_modules[name] = importlib.import_module(f"app.{name}")
+    return module
+
 
 def create_asr_engine_from_config():
     """Create ASR engine based on configuration."""
@@ -39,7 +101,7 @@ def create_asr_engine_from_config():
             logger.info("Using macOS native speech recognition")
             return create_asr_engine(language=config.ASR_LANGUAGE)
         except ImportError as e:
-            logger.error(f"Failed to import macOS ASR: {e}")
+            logger.error("Failed to import macOS ASR: %s", e)
             console.print("[yellow]⚠️  Falling back to text input mode[/yellow]")
             from app.asr import create_asr_engine
             return create_asr_engine()
@@ -48,7 +110,7 @@ def create_asr_engine_from_config():
         logger.info("Using text input mode")
         return create_asr_engine()
     else:
-        logger.warning(f"Unknown ASR engine: {asr_engine}, using text input")
+        logger.warning("Unknown ASR engine: %s, using text input", asr_engine)
         from app.asr import create_asr_engine
         return create_asr_engine()
 
@@ -60,7 +122,8 @@ def process_utterance(
     verbalizer,
     tts,
     dry_run: bool = False,
-    plan_debug: bool = False
+    plan_debug: bool = False,
+    wait_for_speech: bool = True
 ) -> bool:
     """
     处理单条用户输入，支持单步 Intent 或多步 Plan。
@@ -74,6 +137,7 @@ def process_utterance(
         tts: TTS engine instance
         dry_run: If True, only show what would be executed
         plan_debug: If True, show plan but don't execute
+        wait_for_speech: If False, return without waiting for the result speech
 
     Returns:
         True to continue, False to exit
@@ -85,21 +149,23 @@ def process_utterance(
 
     try:
         # Parse plan or intent
-        console.print(f"\n[cyan]📝 Planning...[/cyan]")
-        result = planner.parse_plan_or_intent(text, dry_run=dry_run or plan_debug)
-
-        # Check if it's a Plan or Intent
-        if isinstance(result, Plan):
-            return process_plan(result, executor, verbalizer, tts, dry_run, plan_debug)
+        if _IS_TTY:
+            _echo(PLANNING_MSG)
+        if not planner.use_llm and not planner.is_multi_step(text):
+            # Rules only, single step: the rule intent is the whole answer
+            kind, result = "intent", planner.plan(text)
         else:
-            return process_intent(result, executor, verbalizer, tts, dry_run)
+            kind, result = planner.stream_plan_or_intent(text, dry_run=dry_run or plan_debug)
+
+        # Dispatch on the planner's tag: "intent", "plan" or "stream"
+        return _DISPATCH[kind](result, executor, verbalizer, tts, dry_run, plan_debug, wait_for_speech)
 
     except KeyboardInterrupt:
         logger.info("Interrupted by user")
         return False
     except Exception as e:
-        logger.error(f"Error processing utterance: {e}")
-        console.print(f"[bold red]Error:[/bold red] {e}")
+        logger.error("Error processing utterance: %s", e)
+        _echo(ERROR_TMPL.format(e))
         tts.speak("抱歉，出错了")
         return True
 
@@ -109,21 +175,30 @@ def process_intent(
     executor,
     verbalizer,
     tts,
-    dry_run: bool = False
+    dry_run: bool = False,
+    plan_debug: bool = False,
+    wait_for_speech: bool = True
 ) -> bool:
     """
     处理单步 Intent（原有逻辑）。
     (Process a single Intent - original logic)
+
+    The confirmation is spoken while the executor runs; the result speech is
+    only awaited when wait_for_speech is True. plan_debug shows the intent
+    without executing it, like dry_run.
     """
+    dry_run = dry_run or plan_debug
+
     # Display intent
-    console.print(Panel(
-        f"[bold]Intent:[/bold] {intent.intent}\n"
-        f"[bold]Slots:[/bold] {intent.slots}\n"
-        f"[bold]Confirm:[/bold] {intent.confirm}\n"
-        f"[bold]Safety:[/bold] {intent.safety}",
-        title="🎯 Parsed Intent",
-        border_style="green"
-    ))
+    if _IS_TTY:
+        _echo(INTENT_TMPL.format(
+            intent=intent.intent,
+            slots=intent.slots,
+            confirm=intent.confirm,
+            safety=intent.safety
+        ))
+    else:
+        logger.info("intent=%s slots=%s", intent.intent, intent.slots)
 
     # Confirmation if needed
     if intent.confirm:
@@ -136,34 +211,33 @@ def process_intent(
                 tts.speak("已取消")
                 return True
 
-    # Generate and speak confirmation
+    # Generate and speak confirmation (overlaps with execution)
+    speech = None
     if not intent.confirm:
         confirmation = verbalizer.generate_confirmation(intent)
-        tts.speak(confirmation)
+        speech = tts.speak_async(confirmation)
 
     # Execute
     if dry_run:
         msg = verbalizer.generate_dry_run_message(intent)
-        console.print(f"\n[yellow]{msg}[/yellow]")
+        _echo(DRY_RUN_TMPL.format(msg))
     else:
-        console.print(f"\n[cyan]⚙️  Executing...[/cyan]")
+        if _IS_TTY:
+            _echo(EXECUTING_MSG)
         result = executor.execute(intent)
 
         # Display result
         if result.success:
-            console.print(Panel(
-                f"[bold green]✓ Success[/bold green]\n{result.message}",
-                border_style="green"
-            ))
+            _echo(SUCCESS_TMPL.format(message=result.message))
         else:
-            console.print(Panel(
-                f"[bold red]✗ Failed[/bold red]\n{result.message}\n[dim]{result.error}[/dim]",
-                border_style="red"
-            ))
+            _echo(FAILURE_TMPL.format(message=result.message, error=result.error))
 
-        # Speak result
+        # Speak result (queued after the confirmation)
         result_msg = verbalizer.generate_result_message(intent, result)
-        tts.speak(result_msg)
+        speech = tts.speak_async(result_msg)
+
+    if speech is not None and wait_for_speech:
+        speech.result()
 
     return True
 
@@ -174,19 +248,29 @@ def process_plan(
     verbalizer,
     tts,
     dry_run: bool = False,
-    plan_debug: bool = False
+    plan_debug: bool = False,
+    wait_for_speech: bool = True
 ) -> bool:
     """
     处理多步 Plan，顺序执行，失败即停。
     (Process multi-step Plan, execute sequentially, stop on first failure)
+
+    Status speech is queued on the TTS worker so steps never wait for it;
+    only speech that precedes a confirmation prompt, and the final summary
+    when wait_for_speech is True, is awaited.
     """
+    from rich.panel import Panel
+
     # Display plan overview
     plan_steps = "\n".join([
         f"  {i+1}. [{step.intent}] {step.slots}"
         for i, step in enumerate(plan.plan)
     ])
 
-    console.print(Panel(
+    if not _IS_TTY:
+        logger.info("plan summary=%s steps=%d", plan.summary, len(plan.plan))
+
+    _print(Panel(
         f"[bold]Plan Summary:[/bold] {plan.summary}\n"
         f"[bold]Total Steps:[/bold] {len(plan.plan)}\n\n"
         f"[bold]Steps:[/bold]\n{plan_steps}",
@@ -210,51 +294,17 @@ def process_plan(
                 tts.speak("已取消")
                 return True
     else:
-        tts.speak(f"好的，开始执行{len(plan.plan)}个步骤")
-
-    # Execute each step sequentially
-    for i, intent in enumerate(plan.plan):
-        console.print(f"\n[cyan]📍 Step {i+1}/{len(plan.plan)}: {intent.intent}[/cyan]")
-
-        # Display step intent
-        console.print(Panel(
-            f"[bold]Intent:[/bold] {intent.intent}\n"
-            f"[bold]Slots:[/bold] {intent.slots}\n"
-            f"[bold]Safety:[/bold] {intent.safety}",
-            title=f"Step {i+1}",
-            border_style="cyan"
-        ))
-
-        # Step-level confirmation if needed
-        if intent.confirm and not dry_run:
-            confirmation = verbalizer.generate_confirmation(intent)
-            tts.speak(confirmation)
-            response = typer.confirm(f"继续执行步骤 {i+1}？", default=False)
-            if not response:
-                tts.speak("计划已中止")
-                console.print(f"\n[yellow]⚠️  Plan aborted at step {i+1}[/yellow]")
-                return True
-
-        # Execute step
-        if dry_run:
-            msg = verbalizer.generate_dry_run_message(intent)
-            console.print(f"   [yellow]{msg}[/yellow]")
-        else:
-            result = executor.execute(intent)
-
-            # Display result
-            if result.success:
-                console.print(f"   [green]✓ Step {i+1} completed[/green]")
-            else:
-                console.print(Panel(
-                    f"[bold red]✗ Step {i+1} Failed[/bold red]\n{result.message}\n[dim]{result.error}[/dim]",
-                    border_style="red"
-                ))
-
-                # Stop on failure
-                tts.speak(f"第{i+1}步失败，计划中止")
-                console.print(f"\n[red]❌ Plan stopped at step {i+1} due to failure[/red]")
-                return True
+        tts.speak_async(f"好的，开始执行{len(plan.plan)}个步骤")
+
+    # Execute each step sequentially; results are rendered once at the end
+    rows: List[StepRow] = []
+    completed = all(
+        _run_plan_step(intent, i + 1, len(plan.plan), executor, verbalizer, tts, dry_run, rows)
+        for i, intent in enumerate(plan.plan)
+    )
+    console.print(_plan_table(rows))
+    if not completed:
+        return True
 
     # All steps succeeded
     if not dry_run:
@@ -262,20 +312,173 @@ def process_plan(
             f"[bold green]✓ All {len(plan.plan)} steps completed successfully[/bold green]",
             border_style="green"
         ))
-        tts.speak(f"所有{len(plan.plan)}个步骤已完成")
+        tts.speak(f"所有{len(plan.plan)}个步骤已完成", blocking=wait_for_speech)
     else:
         console.print(f"\n[yellow]Dry run: would execute {len(plan.plan)} steps[/yellow]")
 
     return True
 
 
+def process_plan_stream(
+    steps: Iterator[Intent],
+    executor,
+    verbalizer,
+    tts,
+    dry_run: bool = False,
+    plan_debug: bool = False,
+    wait_for_speech: bool = True
+) -> bool:
+    """
+    执行流式 Plan：每个步骤生成后立即执行，失败即停。
+    (Execute a streamed Plan: each step runs as soon as it arrives, stop on first failure)
+
+    Without the full plan up front there is no plan-level confirmation;
+    steps that need confirmation are confirmed individually. The planner
+    never streams in dry-run or plan-debug mode. If the stream fails
+    after some steps ran, the plan is reported as interrupted.
+    """
+    from rich.markup import escape
+    from rich.panel import Panel
+
+    _print(Panel(
+        "[bold]Plan steps are executed as they are generated[/bold]",
+        title="🗂️  Multi-Step Plan (streaming)",
+        border_style="blue"
+    ))
+    tts.speak_async("好的，开始执行计划")
+
+    count = 0
+    rows: List[StepRow] = []
+    try:
+        while True:
+            try:
+                intent = next(steps)
+            except StopIteration:
+                break
+            except Exception as e:
+                # The stream broke off after some steps ran: the plan is incomplete
+                logger.error("Plan stream interrupted after %d steps: %s", count, e)
+                console.print(_plan_table(rows))
+                console.print(f"\n[red]❌ Plan interrupted after step {count}: {escape(str(e))}[/red]")
+                tts.speak(f"计划在第{count}步后中断", blocking=wait_for_speech)
+                return True
+
+            count += 1
+            if not _run_plan_step(intent, count, None, executor, verbalizer, tts, False, rows):
+                console.print(_plan_table(rows))
+                return True
+    finally:
+        steps.close()  # stops the LLM stream if the plan was cut short
+
+    console.print(_plan_table(rows))
+
+    if not _IS_TTY:
+        logger.info("plan steps=%d", count)
+    console.print(Panel(
+        f"[bold green]✓ All {count} steps completed successfully[/bold green]",
+        border_style="green"
+    ))
+    tts.speak(f"所有{count}个步骤已完成", blocking=wait_for_speech)
+    return True
+
+
+# Planner result tag -> handler(result, executor, verbalizer, tts, dry_run, plan_debug, wait_for_speech)
+_DISPATCH = {
+    "intent": process_intent,
+    "plan": process_plan,
+    "stream": process_plan_stream,
+}
+
+
+def _run_plan_step(
+    intent: Intent,
+    step: int,
+    total: Optional[int],
+    executor,
+    verbalizer,
+    tts,
+    dry_run: bool,
+    rows: List[StepRow]
+) -> bool:
+    """
+    Confirm and execute one plan step, recording its outcome in rows.
+
+    Only a one-line progress marker is written per step; the step details
+    are rendered later, together, by _plan_table.
+
+    Args:
+        step: 1-based step number
+        total: Number of steps, or None while a plan is still streaming
+        rows: Step records for the plan table
+
+    Returns:
+        True to continue with the next step, False if the plan stopped
+    """
+    from rich.markup import escape
+
+    label = f"{step}/{total}" if total else str(step)
+    if _IS_TTY:
+        _echo(STEP_TMPL.format(label=label, intent=intent.intent))
+    else:
+        logger.info("step %s intent=%s slots=%s", label, intent.intent, intent.slots)
+
+    slots = escape(str(intent.slots))
+
+    # Step-level confirmation if needed
+    if intent.confirm and not dry_run:
+        confirmation = verbalizer.generate_confirmation(intent)
+        tts.speak(confirmation)
+        response = typer.confirm(f"继续执行步骤 {step}？", default=False)
+        if not response:
+            tts.speak("计划已中止")
+            rows.append((step, intent.intent, slots, "[yellow]⚠️  aborted[/yellow]"))
+            return False
+
+    # Execute step
+    if dry_run:
+        msg = verbalizer.generate_dry_run_message(intent)
+        rows.append((step, intent.intent, slots, f"[yellow]{escape(msg)}[/yellow]"))
+        return True
+
+    result = executor.execute(intent)
+
+    # Record result
+    if result.success:
+        rows.append((step, intent.intent, slots, "[green]✓[/green]"))
+        return True
+
+    rows.append((
+        step, intent.intent, slots,
+        f"[bold red]✗ {escape(result.message)}[/bold red]\n[dim]{escape(result.error)}[/dim]"
+    ))
+
+    # Stop on failure
+    tts.speak(f"第{step}步失败，计划中止")
+    return False
+
+
+def _plan_table(rows: List[StepRow]):
+    """Render recorded plan steps as one rich Table."""
+    from rich.table import Table
+
+    table = Table(title="🗂️  Plan Steps", border_style="cyan")
+    table.add_column("Step", justify="right")
+    table.add_column("Intent", style="bold")
+    table.add_column("Slots")
+    table.add_column("Status")
+    for step, intent, slots, status in rows:
+        table.add_row(str(step), intent, slots, status)
+    return table
+
+
 @app.command()
 def run(
     text: Optional[str] = typer.Option(None, "--text", "-t", help="直接输入文本，跳过 ASR"),
     dry_run: bool = typer.Option(False, "--dry-run", help="只显示将执行的操作，不实际执行"),
     plan_debug: bool = typer.Option(False, "--plan-debug", help="只显示计划（Plan），不执行"),
     no_llm: bool = typer.Option(False, "--no-llm", help="不使用 LLM，仅使用规则"),
-    loop: bool = typer.Option(False, "--loop", "-l", help="循环模式，持续监听")
+    loop: bool = typer.Option(False, "--loop", "-l", help="循环模式，持续监听"),
+    warmup: bool = typer.Option(True, "--warmup/--no-warmup", help="监听前预热规划器、LLM 连接和 TTS")
 ):
     """
     Start the voice assistant (支持多步骤任务).
@@ -293,6 +496,8 @@ def run(
         # Interactive mode
         python app/main.py run --loop
     """
+    from rich.panel import Panel
+
     # Validate configuration
     if not dry_run and not no_llm and not config.validate():
         console.print("[bold red]Error:[/bold red] ANTHROPIC_API_KEY not set in .env file")
@@ -301,7 +506,7 @@ def run(
 
     # Welcome message
     mode_str = "PLAN DEBUG" if plan_debug else ("DRY RUN" if dry_run else "EXECUTE")
-    console.print(Panel(
+    _print(Panel(
         "[bold]Voice-activated macOS Assistant[/bold]\n"
         "[dim]支持多步骤任务组合 (Multi-step task chaining)[/dim]\n\n"
         f"Mode: {mode_str}\n"
@@ -313,19 +518,24 @@ def run(
     ))
 
     # Initialize components
-    console.print("[cyan]Initializing components...[/cyan]")
-    planner = create_planner(use_llm=not no_llm)
-    executor = create_executor(dry_run=dry_run)
-    verbalizer = create_verbalizer()
-    tts = create_tts_engine()
+    _print("[cyan]Initializing components...[/cyan]")
+    planner = _module("planner").create_planner(use_llm=not no_llm)
+    executor = _module("executor").create_executor(dry_run=dry_run)
+    verbalizer = _module("verbalizer").create_verbalizer()
+    tts = _module("tts").create_tts_queue()
 
     # Single text mode
     if text:
-        console.print(f"\n[bold]User:[/bold] {text}")
+        _print(f"\n[bold]User:[/bold] {text}")
         process_utterance(text, planner, executor, verbalizer, tts, dry_run, plan_debug)
         return
 
     # Loop mode (with or without --loop flag)
+    if warmup:
+        # Pay first-call costs before the user speaks; the LLM warms in the background
+        planner.warmup()
+        tts.warmup()
+
     asr = create_asr_engine_from_config()
 
     if config.ASR_ENGINE == "macos":
@@ -344,7 +554,8 @@ def run(
 
         # Process
         should_continue = process_utterance(
-            user_text, planner, executor, verbalizer, tts, dry_run, plan_debug
+            user_text, planner, executor, verbalizer, tts, dry_run, plan_debug,
+            wait_for_speech=False
         )
 
         if not should_continue:
@@ -371,7 +582,7 @@ def test():
 
     # Test planner (rule-based only)
     console.print("\n[bold]2. Testing rule-based planner...[/bold]")
-    planner = create_planner(use_llm=False)
+    planner = _module("planner").create_planner(use_llm=False)
     test_cases = [
         "把音量调到50%",
         "搜索Python教程",
@@ -384,7 +595,7 @@ def test():
 
     # Test TTS
     console.print("\n[bold]3. Testing TTS...[/bold]")
-    tts = create_tts_engine()
+    tts = _module("tts").create_tts_engine()
     console.print("   Speaking test message...")
     tts.speak("测试成功")
 
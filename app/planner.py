@@ -5,56 +5,241 @@ Priority: LLM → rule-based fallback on failure.
 """
 import logging
 import re
-from typing import Optional, Union
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Iterator, Literal, Optional, Tuple, Union
 
 from .config import config
 from .schema import Intent, Plan
 from .llm import get_llm_client
 from .utils import logger
 
+try:
+    import ahocorasick  # optional: pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Rule-based keyword table: (intent, patterns) in priority order.
+# Immutable; compiled into the module-level regexes below.
+INTENT_KEYWORDS = (
+    ("system_setting", (
+        r"音量|声音|volume",
+        r"亮度|brightness",
+        r"截图|screenshot",
+        r"静音|mute"
+    )),
+    ("play_music", (
+        r"播放|play",
+        r"暂停|pause",
+        r"音乐|歌曲|music|song",
+        r"下一首|上一首|next|previous"
+    )),
+    ("web_search", (
+        r"搜索|查找|search|google|百度",
+        r"找一下|查一下"
+    )),
+    ("write_note", (
+        r"记录|笔记|备忘|note|memo",
+        r"写下|记下"
+    )),
+    ("control_app", (
+        r"打开.*应用|打开.*app|open.*app",
+        r"启动|关闭|quit",
+        r"safari|chrome|微信|wechat"
+    )),
+)
+
+# Dangerous keywords requiring confirmation
+DANGEROUS_KEYWORDS = (
+    r"删除|delete|remove",
+    r"清空|清除|clear|clean",
+    r"格式化|format",
+    r"关闭.*网络|断网|disconnect",
+    r"重启|关机|shutdown|restart",
+    r"卸载|uninstall"
+)
+
+# Utterances run through the rules by Planner.warmup (single step, multi-step)
+WARMUP_UTTERANCES = ("把音量调到50%", "打开Safari然后搜索天气")
+
+# 多步骤连接词 (multi-step connectives: then, next, after, again, next step, finally)
+MULTI_STEP_CONNECTIVES = ("然后", "接着", "之后", "再", "完成后", "接下来", "下一步", "最后")
+
+# Patterns are compiled once at import; IGNORECASE replaces per-call lower()
+#
+# All intent keywords are fused into one regex. Each alternative is an
+# anchored lookahead that succeeds if any of that intent's patterns occurs
+# anywhere in the text, so alternatives are tried in table order and the
+# first intent with a hit wins (m.lastgroup) - the same priority as testing
+# intents one by one, unlike a plain alternation which picks the leftmost hit.
+# Use with .match(), which anchors at its start position.
+_INTENT_RE = re.compile(
+    "(?:" + "|".join(
+        f"(?=[\\s\\S]*?(?:{'|'.join(patterns)}))(?P<{name}>)"
+        for name, patterns in INTENT_KEYWORDS
+    ) + ")",
+    re.IGNORECASE
+)
+_DANGEROUS_RE = re.compile("|".join(f"(?:{pattern})" for pattern in DANGEROUS_KEYWORDS), re.IGNORECASE)
+# Multiple clauses separated by commas, or multiple sentences
+_MULTI_CLAUSE_RE = re.compile(r"，.{3,}，|。.{3,}。")
+_SPLIT_RE = re.compile(r'[，。、]|然后|接着|之后|再|接下来')
+
+# Connectives are literals: one Aho-Corasick pass when available, else one regex
+if ahocorasick is not None:
+    _CONNECTIVE_AC = ahocorasick.Automaton()
+    for _word in MULTI_STEP_CONNECTIVES:
+        _CONNECTIVE_AC.add_word(_word, _word)
+    _CONNECTIVE_AC.make_automaton()
+
+    def _find_connective(text: str) -> Optional[str]:
+        """Return the first multi-step connective in text, if any."""
+        for _, word in _CONNECTIVE_AC.iter(text):
+            return word
+        return None
+else:
+    _CONNECTIVE_RE = re.compile("|".join(map(re.escape, MULTI_STEP_CONNECTIVES)))
+
+    def _find_connective(text: str) -> Optional[str]:
+        """Return the first multi-step connective in text, if any."""
+        match = _CONNECTIVE_RE.search(text)
+        return match.group() if match else None
+
+# Slot extraction
+_VOLUME_RE = re.compile(r'(\d+)\s*%|音量.*?(\d+)')
+_MUSIC_ACTION_PATTERNS = (
+    ("pause", re.compile(r"暂停|pause", re.IGNORECASE)),
+    ("next", re.compile(r"下一首|next", re.IGNORECASE)),
+    ("previous", re.compile(r"上一首|previous", re.IGNORECASE)),
+    ("play", re.compile(r"播放|play", re.IGNORECASE)),
+)
+_QUERY_RE = re.compile(r'(?:搜索|查找|search)\s*(.+)', re.IGNORECASE)
+_NOTE_RE = re.compile(r'(?:记录|笔记|note)\s*[:：]?\s*(.+)', re.IGNORECASE)
+_OPEN_APP_RE = re.compile(r'打开\s*(\w+)')
+
+# Slot extraction is table driven: one pattern per intent, searched once,
+# then a post-processor turning (match or None, text) into slots
+_SLOT_RES = {
+    "system_setting": _VOLUME_RE,
+    "web_search": _QUERY_RE,
+    "write_note": _NOTE_RE,
+    "control_app": _OPEN_APP_RE,
+}
+
+
+def _volume_slots(match: Optional[re.Match], text: str) -> dict:
+    """Extract volume percentage."""
+    if not match:
+        return {}
+    return {"setting": "volume", "value": int(match.group(1) or match.group(2))}
+
+
+def _music_slots(match: Optional[re.Match], text: str) -> dict:
+    """Map playback keywords to a music action (first pattern in order wins)."""
+    for action, pattern in _MUSIC_ACTION_PATTERNS:
+        if pattern.search(text):
+            return {"action": action}
+    return {}
+
+
+def _note_slots(match: Optional[re.Match], text: str) -> dict:
+    """Use the text after the note keyword; its first 20 chars are the title."""
+    if not match:
+        return {"title": "Quick Note", "body": text}
+    content = match.group(1).strip()
+    return {"title": content[:20], "body": content}
+
+
+_SLOT_POST = {
+    "system_setting": _volume_slots,
+    "play_music": _music_slots,
+    "web_search": lambda match, text: {"query": match.group(1).strip() if match else text},
+    "write_note": _note_slots,
+    "control_app": lambda match, text: {"app": match.group(1), "action": "open"} if match else {},
+}
+# Whitespace and punctuation (ASCII and CJK), ignored by loose cache keys;
+# '.' and '%' are kept so "3.5" never matches "35"
+_PUNCT_RE = re.compile(r'[^\w.%]+|_+')
+
+
+# parse_plan_or_intent returns (kind, result) so callers dispatch on the tag
+PlanKind = Literal["plan", "intent", "stream"]
+PlanResult = Tuple[PlanKind, Union[Intent, Plan, Iterator[Intent]]]
+
+
+def _tagged(result: Union[Intent, Plan]) -> PlanResult:
+    """Tag a result whose type is only known at runtime (LLM, cache)."""
+    return ("plan", result) if type(result) is Plan else ("intent", result)
+
+
+@dataclass(frozen=True)
+class _TextFeatures:
+    """Whole-utterance checks, computed once and shared by every planning pass."""
+    is_dangerous: bool
+    is_multi_step: bool
+
+
+class _ResultCache:
+    """
+    Small LRU of LLM planning results keyed by normalised utterance.
+
+    With loose keys, whitespace and punctuation are ignored too, so ASR
+    variations such as "打开Safari，然后搜索天气" and "打开 Safari 然后搜索天气。"
+    share an entry. Any other difference (a word, a number) is a miss.
+    """
+
+    def __init__(self, maxsize: int = 256, loose: bool = False):
+        self.maxsize = maxsize
+        self.loose = loose
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()  # LLM results are stored from worker threads
+
+    def _key(self, text: str) -> str:
+        key = text.strip().lower()
+        if self.loose:
+            key = _PUNCT_RE.sub("", key) or key
+        return key
+
+    def get(self, text: str) -> Optional[Union[Intent, Plan]]:
+        """Return a private copy of the cached result, or None."""
+        key = self._key(text)
+        with self._lock:
+            result = self._data.get(key)
+            if result is None:
+                return None
+            self._data.move_to_end(key)
+        # Callers mutate results (_enhance_safety), so never hand out the cached object
+        return result.model_copy(deep=True)
+
+    def put(self, text: str, result: Union[Intent, Plan]) -> None:
+        key = self._key(text)
+        result = result.model_copy(deep=True)
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
 
 class Planner:
     """Intent planning with LLM and rule-based fallback."""
 
-    # Rule-based keyword mapping
-    INTENT_KEYWORDS = {
-        "system_setting": [
-            r"音量|声音|volume",
-            r"亮度|brightness",
-            r"截图|screenshot",
-            r"静音|mute"
-        ],
-        "play_music": [
-            r"播放|play",
-            r"暂停|pause",
-            r"音乐|歌曲|music|song",
-            r"下一首|上一首|next|previous"
-        ],
-        "web_search": [
-            r"搜索|查找|search|google|百度",
-            r"找一下|查一下"
-        ],
-        "write_note": [
-            r"记录|笔记|备忘|note|memo",
-            r"写下|记下"
-        ],
-        "control_app": [
-            r"打开.*应用|打开.*app|open.*app",
-            r"启动|关闭|quit",
-            r"safari|chrome|微信|wechat"
-        ]
+    # Slots a rule-based intent must fill before it is trusted without the LLM
+    REQUIRED_SLOTS = {
+        "system_setting": ("setting", "value"),
+        "play_music": ("action",),
+        "web_search": ("query",),
+        "write_note": ("body",),
+        "control_app": ("app",),
     }
 
-    # Dangerous keywords requiring confirmation
-    DANGEROUS_KEYWORDS = [
-        r"删除|delete|remove",
-        r"清空|清除|clear|clean",
-        r"格式化|format",
-        r"关闭.*网络|断网|disconnect",
-        r"重启|关机|shutdown|restart",
-        r"卸载|uninstall"
-    ]
-
     def __init__(self, use_llm: bool = True):
         """
         Initialize planner.
@@ -64,11 +249,35 @@ class Planner:
         """
         self.use_llm = use_llm
         self.llm_client = get_llm_client() if use_llm else None
+        self._intent_cache = _ResultCache()
+        # Plans ignore punctuation and spacing (repeated voice commands)
+        self._plan_cache = _ResultCache(loose=True)
+        # LLM calls run here so the rule fallback is computed meanwhile
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm") if use_llm else None
+
+    def cache_clear(self) -> None:
+        """Drop all cached LLM results."""
+        self._intent_cache.clear()
+        self._plan_cache.clear()
+
+    def warmup(self) -> None:
+        """
+        Exercise the rule paths once and open the LLM connection in the background.
+
+        Called before the first utterance so it does not pay first-call costs.
+        """
+        for text in WARMUP_UTTERANCES:
+            self.parse_plan_or_intent(text, dry_run=True)
+        if self.use_llm:
+            self._pool.submit(self.llm_client.warmup)
 
     def plan(self, text: str, dry_run: bool = False) -> Intent:
         """
         Plan intent from user text.
 
+        Strategy: rules first; the LLM is only consulted when the rule result
+        is clarify or misses a required slot.
+
         Args:
             text: User utterance
             dry_run: If True, skip actual LLM call
@@ -76,214 +285,354 @@ class Planner:
         Returns:
             Intent object
         """
-        logger.info(f"Planning for text: {text}")
+        logger.info("Planning for text: %s", text)
 
-        # Try LLM first
-        if self.use_llm and not dry_run:
-            try:
-                intent = self.llm_client.call_llm_to_intent(text)
-                logger.info(f"LLM returned intent: {intent.intent}")
+        # Checked once per call and shared by the rule planner and safety pass
+        is_dangerous = self._check_dangerous(text)
+
+        rule_intent = self._rule_based_plan(text, is_dangerous)
+        if not self.use_llm or dry_run or self._is_confident(rule_intent, text):
+            return rule_intent
 
-                # Enhance safety check
-                intent = self._enhance_safety(intent, text)
-                return intent
-            except Exception as e:
-                logger.error(f"LLM planning failed: {e}, falling back to rules")
+        intent = self._intent_cache.get(text)
+        if intent is not None:
+            logger.info("Cache hit for intent: %s", intent.intent)
+            return self._enhance_safety(intent, text, is_dangerous)
+
+        future = self._submit_llm(self.llm_client.call_llm_to_intent, self._intent_cache, text)
+        intent = self._wait_llm(future)
+        if intent is not None:
+            # Enhance safety check
+            return self._enhance_safety(intent, text, is_dangerous)
 
         # Fallback to rule-based
-        return self._rule_based_plan(text)
+        return rule_intent
+
+    def _submit_llm(self, call, cache: _ResultCache, text: str) -> Future:
+        """
+        Start an LLM call in the worker pool.
 
-    def parse_plan_or_intent(self, text: str, dry_run: bool = False) -> Union[Intent, Plan]:
+        The worker stores the result in cache, so an answer that arrives after
+        the deadline still serves the next identical utterance.
+        """
+        def run():
+            result = call(text)
+            if result is None:
+                return None  # recoverable LLM failure: the caller uses rules
+            if isinstance(result, Plan):
+                logger.info("LLM returned Plan with %d steps", len(result.plan))
+            else:
+                logger.info("LLM returned intent: %s", result.intent)
+
+            # Clarifications are cheap to re-ask and often context dependent
+            if not (isinstance(result, Intent) and result.intent == "clarify"):
+                cache.put(text, result)
+            return result
+
+        return self._pool.submit(run)
+
+    def _wait_llm(self, future: Future) -> Optional[Union[Intent, Plan]]:
+        """
+        Wait up to LLM_TIMEOUT_MS for an LLM call.
+
+        Returns:
+            The LLM result, or None on timeout, recoverable failure (the
+            client returned None) or error
+        """
+        try:
+            return future.result(timeout=config.LLM_TIMEOUT_MS / 1000)
+        except FutureTimeout:
+            future.cancel()
+            logger.warning("LLM did not answer within %d ms, falling back to rules", config.LLM_TIMEOUT_MS)
+        except Exception as e:
+            logger.error("LLM planning failed: %s, falling back to rules", e)
+        return None
+
+    def _is_confident(self, intent: Intent, text: str) -> bool:
+        """
+        Check whether a rule-based intent can be used without the LLM.
+
+        A slot that merely echoes the whole utterance (the extraction fallback)
+        does not count as filled.
+        """
+        if intent.intent == "clarify":
+            return False
+        required = self.REQUIRED_SLOTS.get(intent.intent, ())
+        return all(intent.slots.get(key) not in (None, "", text) for key in required)
+
+    def parse_plan_or_intent(self, text: str, dry_run: bool = False) -> PlanResult:
         """
         解析用户输入，返回单步 Intent 或多步 Plan。
         (Parse user input and return either a single Intent or a multi-step Plan)
 
-        策略：LLM 判断是否为多步任务，输出 Intent 或 Plan。
-        (Strategy: LLM determines if it's multi-step and outputs Intent or Plan)
+        策略：单步且规则可信时直接返回规则结果；否则由 LLM 判断是否为多步任务。
+        (Strategy: confident single-step rule results are returned directly;
+        otherwise the LLM determines if it's multi-step and outputs Intent or Plan)
 
         Args:
             text: User utterance
             dry_run: If True, skip actual LLM call
 
         Returns:
-            Union[Intent, Plan]: Either a single Intent or a Plan with multiple Intents
+            ("intent", Intent) or ("plan", Plan)
         """
-        logger.info(f"Parsing plan or intent for text: {text}")
+        return self._parse_plan_or_intent(text, self._precompute(text), dry_run)
+
+    def _parse_plan_or_intent(self, text: str, features: _TextFeatures, dry_run: bool) -> PlanResult:
+        """parse_plan_or_intent with the utterance checks already done."""
+        logger.info("Parsing plan or intent for text: %s", text)
+        is_dangerous = features.is_dangerous
+
+        # Rules first for single-step text
+        rule_intent = None
+        if not features.is_multi_step:
+            rule_intent = self._rule_based_plan(text, is_dangerous)
+            if self._is_confident(rule_intent, text):
+                return "intent", self._enhance_safety(rule_intent, text, is_dangerous)
 
-        # Try LLM first
+        # Otherwise ask the LLM
         if self.use_llm and not dry_run:
-            try:
-                result = self.llm_client.call_llm_to_plan(text)
-
-                # Check if result is Plan or Intent
-                if isinstance(result, Plan):
-                    logger.info(f"LLM returned Plan with {len(result.plan)} steps")
-                    # Enhance safety check for each intent in plan
-                    for i, intent in enumerate(result.plan):
-                        result.plan[i] = self._enhance_safety(intent, text)
-                    return result
-                else:
-                    logger.info(f"LLM returned single Intent: {result.intent}")
-                    result = self._enhance_safety(result, text)
-                    return result
-
-            except Exception as e:
-                logger.error(f"LLM planning failed: {e}, falling back to single intent")
-
-        # Fallback: check if text contains multi-step indicators
-        if self._is_multi_step_text(text):
+            result = self._plan_cache.get(text)
+            if result is not None:
+                logger.info("Cache hit for plan or intent")
+                return _tagged(self._enhance_result_safety(result, text, is_dangerous))
+
+            # The rule fallback is built while the LLM request is in flight
+            future = self._submit_llm(self.llm_client.call_llm_to_plan, self._plan_cache, text)
+            fallback = self._fallback_plan_or_intent(text, features, rule_intent)
+
+            result = self._wait_llm(future)
+            if result is not None:
+                return _tagged(self._enhance_result_safety(result, text, is_dangerous))
+            return fallback
+
+        return self._fallback_plan_or_intent(text, features, rule_intent)
+
+    def _fallback_plan_or_intent(
+        self,
+        text: str,
+        features: _TextFeatures,
+        rule_intent: Optional[Intent]
+    ) -> PlanResult:
+        """Rule-based result for parse_plan_or_intent."""
+        # Check if text contains multi-step indicators
+        if features.is_multi_step:
             # Split by common delimiters and create Plan
             intents = self._split_to_intents(text)
             if len(intents) > 1:
-                return Plan(
+                # Steps come from _keyword_intent: no validation needed
+                return "plan", Plan.trusted(
                     plan=intents,
                     summary=f"执行{len(intents)}个任务"
                 )
 
         # Default to single intent
-        return self._rule_based_plan(text)
+        return "intent", rule_intent or self._rule_based_plan(text, features.is_dangerous)
+
+    def stream_plan_or_intent(self, text: str, dry_run: bool = False) -> PlanResult:
+        """
+        与 parse_plan_or_intent 相同，但多步 LLM 结果以流的形式返回。
+        (Like parse_plan_or_intent, but multi-step LLM plans are streamed)
+
+        With LLM_STREAM_PLAN enabled, multi-step text that is not cached
+        returns an iterator of safety-checked steps, so the first step can run
+        while the rest is still being generated. Everything else is returned
+        exactly as parse_plan_or_intent would.
+
+        Args:
+            text: User utterance
+            dry_run: If True, skip actual LLM call
+
+        Returns:
+            ("intent", Intent), ("plan", Plan) or ("stream", Iterator[Intent])
+        """
+        if not (config.LLM_STREAM_PLAN and self.use_llm and not dry_run):
+            return self.parse_plan_or_intent(text, dry_run=dry_run)
+
+        features = self._precompute(text)
+        if not features.is_multi_step:
+            return self._parse_plan_or_intent(text, features, dry_run)
+
+        result = self._plan_cache.get(text)
+        if result is not None:
+            logger.info("Cache hit for plan or intent")
+            return _tagged(self._enhance_result_safety(result, text, features.is_dangerous))
+
+        return "stream", self._stream_llm_steps(text, features)
+
+    def _stream_llm_steps(self, text: str, features: _TextFeatures) -> Iterator[Intent]:
+        """
+        Yield plan steps from the LLM as they arrive.
+
+        Falls back to the rule-based plan if the stream fails before its
+        first step; a complete multi-step stream is cached as a Plan.
+
+        Raises:
+            Exception: The stream error, if it fails after a step was yielded
+                (the plan is incomplete)
+        """
+        is_dangerous = features.is_dangerous
+        steps = []
+        try:
+            for intent in self.llm_client.stream_plan(text):
+                steps.append(intent.model_copy(deep=True))
+                yield self._enhance_safety(intent, text, is_dangerous)
+        except Exception as e:
+            logger.error("LLM plan stream failed: %s", e)
+            if steps:
+                raise
+            kind, fallback = self._fallback_plan_or_intent(text, features, None)
+            yield from (fallback.plan if kind == "plan" else [fallback])
+            return
+
+        if len(steps) > 1:
+            # Steps were validated as they streamed in
+            self._plan_cache.put(text, Plan.trusted(plan=steps, summary=f"执行{len(steps)}个任务"))
+
+    def is_multi_step(self, text: str) -> bool:
+        """
+        Whether text looks like a multi-step command.
+
+        Without the LLM, text that is not multi-step always plans to the
+        plan() result, so callers can skip parse_plan_or_intent.
+        """
+        return self._is_multi_step_text(text)
+
+    def _precompute(self, text: str) -> _TextFeatures:
+        """Run the whole-utterance checks once for every planning pass."""
+        return _TextFeatures(
+            is_dangerous=self._check_dangerous(text),
+            is_multi_step=self._is_multi_step_text(text)
+        )
 
     def _is_multi_step_text(self, text: str) -> bool:
         """
         检测文本是否包含多步骤指示词。
         (Detect if text contains multi-step indicators)
         """
-        multi_step_keywords = [
-            r"然后|接着|之后|再|完成后",  # then, next, after, again
-            r"，.{3,}，",  # Multiple clauses separated by commas
-            r"。.{3,}。",  # Multiple sentences
-            r"接下来|下一步|最后",  # next, next step, finally
-        ]
-
-        for pattern in multi_step_keywords:
-            if re.search(pattern, text):
-                logger.info(f"Multi-step indicator detected: {pattern}")
-                return True
+        connective = _find_connective(text)
+        if connective is not None:
+            logger.debug("Multi-step indicator detected: %s", connective)
+            return True
+
+        match = _MULTI_CLAUSE_RE.search(text)
+        if match:
+            logger.debug("Multi-step indicator detected: %s", match.group())
+            return True
         return False
 
     def _split_to_intents(self, text: str) -> list[Intent]:
         """
         简单拆分多步任务为单步 Intent 列表（规则引擎回退逻辑）。
         (Simple splitting of multi-step task into list of Intents - rule engine fallback)
+
+        One pass over the clauses between delimiters; each clause gets one
+        fused keyword match. Dangerous or unmatched clauses are skipped.
         """
-        # Split by common delimiters
-        parts = re.split(r'[，。、]|然后|接着|之后|再|接下来', text)
         intents = []
+        start = 0
+        for delimiter in (*_SPLIT_RE.finditer(text), None):
+            end = delimiter.start() if delimiter else len(text)
+            part = text[start:end].strip()
+            if delimiter:
+                start = delimiter.end()
+
+            # Skip very short and dangerous parts
+            if len(part) <= 2 or _DANGEROUS_RE.search(part):
+                continue
 
-        for part in parts:
-            part = part.strip()
-            if len(part) > 2:  # Skip very short parts
-                try:
-                    intent = self._rule_based_plan(part)
-                    if intent.intent != "clarify":  # Only add valid intents
-                        intents.append(intent)
-                except Exception as e:
-                    logger.warning(f"Failed to parse part '{part}': {e}")
-                    continue
+            match = _INTENT_RE.match(part)
+            if match:
+                intents.append(self._keyword_intent(part, match.lastgroup))
 
         return intents if intents else [self._rule_based_plan(text)]
 
-    def _rule_based_plan(self, text: str) -> Intent:
+    def _rule_based_plan(self, text: str, is_dangerous: Optional[bool] = None) -> Intent:
         """
         Rule-based intent recognition as fallback.
 
         Args:
             text: User utterance
+            is_dangerous: Precomputed _check_dangerous(text), if known
 
         Returns:
             Intent object
         """
         logger.info("Using rule-based planning")
 
-        text_lower = text.lower()
-
         # Check dangerous keywords first
-        is_dangerous = self._check_dangerous(text)
+        if is_dangerous is None:
+            is_dangerous = self._check_dangerous(text)
+        # Rule intents are built from literals and extracted slots, so they
+        # skip validation (Intent.trusted)
         if is_dangerous:
-            return Intent(
+            return Intent.trusted(
                 intent="clarify",
                 confirm=True,
                 speak_back=f"您确定要执行「{text}」吗？这可能有风险。",
                 safety={"risk": "high", "reason": "Dangerous operation detected"}
             )
 
-        # Match intent by keywords
-        for intent_name, patterns in self.INTENT_KEYWORDS.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    slots = self._extract_slots(text, intent_name)
-                    return Intent(
-                        intent=intent_name,
-                        slots=slots,
-                        confirm=False,
-                        speak_back=f"好的，{self._get_confirmation_text(intent_name, slots)}",
-                        safety={"risk": "low", "reason": ""}
-                    )
+        # Match intent by keywords (one scan, first intent in table order wins)
+        match = _INTENT_RE.match(text)
+        if match:
+            return self._keyword_intent(text, match.lastgroup)
 
         # No match, return clarify
-        return Intent(
+        return Intent.trusted(
             intent="clarify",
             confirm=True,
             speak_back="抱歉，我不太理解您的意思，能具体说说吗？",
             safety={"risk": "low", "reason": "No matching intent"}
         )
 
+    def _keyword_intent(self, text: str, intent_name: str) -> Intent:
+        """Build the rule-based Intent for a keyword match."""
+        slots = self._extract_slots(text, intent_name)
+        return Intent.trusted(
+            intent=intent_name,
+            slots=slots,
+            confirm=False,
+            speak_back=f"好的，{self._get_confirmation_text(intent_name, slots)}"
+        )
+
     def _check_dangerous(self, text: str) -> bool:
         """Check if text contains dangerous keywords."""
-        text_lower = text.lower()
-        for pattern in self.DANGEROUS_KEYWORDS:
-            if re.search(pattern, text_lower):
-                return True
-        return False
+        return _DANGEROUS_RE.search(text) is not None
 
-    def _enhance_safety(self, intent: Intent, text: str) -> Intent:
+    def _enhance_safety(self, intent: Intent, text: str, is_dangerous: Optional[bool] = None) -> Intent:
         """Enhance safety check on LLM-generated intent."""
-        if self._check_dangerous(text) and intent.safety.get("risk") == "low":
-            intent.safety["risk"] = "high"
-            intent.safety["reason"] = "Dangerous keyword detected"
+        if is_dangerous is None:
+            is_dangerous = self._check_dangerous(text)
+        if is_dangerous and intent.safety.get("risk") == "low":
+            # Copy-on-write: safety may be the shared default
+            intent.safety = {**intent.safety, "risk": "high", "reason": "Dangerous keyword detected"}
             if config.CONFIRM_DANGEROUS:
                 intent.confirm = True
         return intent
 
-    def _extract_slots(self, text: str, intent: str) -> dict:
-        """Extract slots from text based on intent."""
-        slots = {}
-
-        if intent == "system_setting":
-            # Extract volume percentage
-            volume_match = re.search(r'(\d+)\s*%|音量.*?(\d+)', text)
-            if volume_match:
-                volume = volume_match.group(1) or volume_match.group(2)
-                slots["setting"] = "volume"
-                slots["value"] = int(volume)
+    def _enhance_result_safety(
+        self,
+        result: Union[Intent, Plan],
+        text: str,
+        is_dangerous: Optional[bool] = None
+    ) -> Union[Intent, Plan]:
+        """Apply _enhance_safety to an Intent or to every step of a Plan."""
+        if is_dangerous is None:
+            is_dangerous = self._check_dangerous(text)
+        if isinstance(result, Plan):
+            for i, intent in enumerate(result.plan):
+                result.plan[i] = self._enhance_safety(intent, text, is_dangerous)
+            return result
+        return self._enhance_safety(result, text, is_dangerous)
 
-        elif intent == "web_search":
-            # Extract query after search keyword
-            query_match = re.search(r'(?:搜索|查找|search)\s*(.+)', text, re.IGNORECASE)
-            if query_match:
-                slots["query"] = query_match.group(1).strip()
-            else:
-                slots["query"] = text
-
-        elif intent == "write_note":
-            # Try to extract title and body
-            note_match = re.search(r'(?:记录|笔记|note)\s*[:：]?\s*(.+)', text, re.IGNORECASE)
-            if note_match:
-                content = note_match.group(1).strip()
-                slots["title"] = content[:20]  # First 20 chars as title
-                slots["body"] = content
-            else:
-                slots["title"] = "Quick Note"
-                slots["body"] = text
-
-        elif intent == "control_app":
-            # Extract app name and action
-            open_match = re.search(r'打开\s*(\w+)', text)
-            if open_match:
-                slots["app"] = open_match.group(1)
-                slots["action"] = "open"
-
-        return slots
+    def _extract_slots(self, text: str, intent: str) -> dict:
+        """Extract slots from text based on intent (see _SLOT_RES / _SLOT_POST)."""
+        post = _SLOT_POST.get(intent)
+        if post is None:
+            return {}
+        pattern = _SLOT_RES.get(intent)
+        return post(pattern.search(text) if pattern else None, text)
 
     def _get_confirmation_text(self, intent: str, slots: dict) -> str:
         """Generate confirmation text for intent."""
@@ -2,8 +2,8 @@
 Intent schema definitions using Pydantic.
 All LLM outputs must conform to these models.
 """
-from typing import Any, Dict, List, Literal
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional, Union, get_args
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 IntentName = Literal[
@@ -15,6 +15,38 @@ IntentName = Literal[
     "clarify"
 ]
 
+VALID_INTENTS = frozenset(get_args(IntentName))
+
+
+class _FrozenDict(dict):
+    """
+    Read-only dict, shared instead of copied.
+
+    Pydantic deep-copies mutable field defaults; this one returns itself
+    from copy/deepcopy, so every Intent can share it. A MappingProxyType
+    cannot be used: it is neither deep-copyable nor a dict for validation.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("shared default is read-only; assign a new dict instead")
+
+    __setitem__ = __delitem__ = __ior__ = update = pop = popitem = setdefault = clear = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (_FrozenDict, (dict(self),))
+
+
+# Default Intent.safety. Code that changes safety assigns a new dict
+# (copy-on-write) rather than mutating it in place.
+_DEFAULT_SAFETY = _FrozenDict({"risk": "low", "reason": ""})
+
 
 class Intent(BaseModel):
     """Structured intent output from LLM or rule-based planner."""
@@ -22,12 +54,34 @@ class Intent(BaseModel):
     slots: Dict[str, Any] = Field(default_factory=dict)
     confirm: bool = False
     speak_back: str = ""
-    safety: Dict[str, Any] = Field(
-        default_factory=lambda: {"risk": "low", "reason": ""}
-    )
+    safety: Dict[str, Any] = _DEFAULT_SAFETY  # shared, read-only; see _FrozenDict
+
+    # Already-built Intents (e.g. Plan steps) are accepted as-is, never
+    # re-validated or copied
+    model_config = ConfigDict(frozen=False, revalidate_instances="never")
 
-    class Config:
-        frozen = False
+    @classmethod
+    def trusted(
+        cls,
+        intent: str,
+        slots: Optional[Dict[str, Any]] = None,
+        confirm: bool = False,
+        speak_back: str = "",
+        safety: Optional[Dict[str, Any]] = None
+    ) -> "Intent":
+        """
+        Build an Intent from internal data without validation.
+
+        Only for values the code itself produced (rule planner, already
+        validated steps); LLM output must go through normal validation.
+        """
+        return cls.model_construct(
+            intent=intent,
+            slots={} if slots is None else slots,
+            confirm=confirm,
+            speak_back=speak_back,
+            safety=_DEFAULT_SAFETY if safety is None else safety
+        )
 
 
 class Plan(BaseModel):
@@ -36,9 +90,16 @@ class Plan(BaseModel):
     LLM 可输出单个 Intent 或者 Plan (List[Intent])。
     (LLM can output either a single Intent or a Plan containing multiple Intents)
     """
+    model_config = ConfigDict(revalidate_instances="never")
+
     plan: List[Intent]  # 子任务序列 (subtask sequence)
     summary: str = ""   # 整体摘要，用于日志和 TTS 播报 (overall summary for logging/TTS)
 
+    @classmethod
+    def trusted(cls, plan: List[Intent], summary: str = "") -> "Plan":
+        """Build a Plan from already-built Intents without validation."""
+        return cls.model_construct(plan=plan, summary=summary)
+
 
 class ExecutionResult(BaseModel):
     """Result from executor."""
@@ -46,3 +107,50 @@ class ExecutionResult(BaseModel):
     message: str
     output: str = ""
     error: str = ""
+
+
+# Validators built once at import; validate_json parses and validates in one
+# pass in pydantic-core, with no intermediate dict
+INTENT_ADAPTER = TypeAdapter(Intent)
+PLAN_ADAPTER = TypeAdapter(Plan)
+
+
+def parse_intent_json(raw: Union[str, bytes]) -> Intent:
+    """
+    Validate a JSON document as an Intent.
+
+    Raises:
+        ValidationError: If raw is not valid JSON or does not match the schema
+    """
+    return INTENT_ADAPTER.validate_json(raw)
+
+
+def parse_plan_json(raw: Union[str, bytes]) -> Plan:
+    """
+    Validate a JSON document as a Plan.
+
+    Raises:
+        ValidationError: If raw is not valid JSON or does not match the schema
+    """
+    return PLAN_ADAPTER.validate_json(raw)
+
+
+def _warm_up() -> None:
+    """
+    Run each validate/serialize path once at import.
+
+    The schemas are built with the classes, but the first validation and
+    dump still pay one-time setup in pydantic-core; pay it here instead of
+    on the first utterance.
+    """
+    plan = parse_plan_json(
+        '{"plan":[{"intent":"system_setting","slots":{"setting":"volume","value":50,"ratio":0.5,"on":true},'
+        '"confirm":false,"speak_back":"","safety":{"risk":"low","reason":""}}],"summary":""}'
+    )
+    plan.model_dump()
+    plan.model_dump_json()
+    parse_intent_json('{"intent":"clarify"}').model_copy(deep=True)
+    ExecutionResult(success=True, message="").model_dump()
+
+
+_warm_up()
@@ -1,15 +1,39 @@
 """
-TTS (Text-to-Speech) module using macOS 'say' command.
+TTS (Text-to-Speech) module.
+Speaks in-process through NSSpeechSynthesizer when PyObjC is installed,
+otherwise through the macOS 'say' command.
 """
+import queue
 import subprocess
-import logging
+import threading
+import time
+from concurrent.futures import Future
 from typing import Optional
 
-from .utils import logger
+from .utils import logger, resolve_command
+
+try:
+    from AppKit import NSSpeechSynthesizer  # optional: pyobjc-framework-Cocoa
+except ImportError:
+    NSSpeechSynthesizer = None
+
+
+SPEAK_TIMEOUT = 30      # seconds a blocking utterance may take
+SPEAK_POLL = 0.02       # seconds between isSpeaking checks
+REPEAT_WINDOW = 1.0     # seconds in which the same text is not spoken again
 
 
 class TTSEngine:
-    """TTS engine for text-to-speech conversion."""
+    """
+    TTS engine for text-to-speech conversion.
+
+    With PyObjC, one NSSpeechSynthesizer is kept for the session and no
+    process is spawned. Without it, `say` is used: it reads its text from
+    stdin when given none on the command line, so one process is always
+    kept on standby, having already paid for fork/exec and framework
+    loading, and an utterance only has to be written to its stdin. Each
+    utterance uses up one process.
+    """
 
     def __init__(self, voice: Optional[str] = None):
         """
@@ -19,7 +43,87 @@ class TTSEngine:
             voice: Voice name (e.g., "Ting-Ting" for Chinese)
         """
         self.voice = voice or "Ting-Ting"  # Default Chinese voice
-        logger.info(f"TTS initialized with voice: {self.voice}")
+        self._lock = threading.Lock()
+        self._synth = self._create_synthesizer() if NSSpeechSynthesizer is not None else None
+        self._standby: Optional[subprocess.Popen] = None if self._synth else self._spawn()
+
+        # Last utterance started, for skipping immediate repeats
+        self._last_text = ""
+        self._last_at = 0.0
+        self._last_proc: Optional[subprocess.Popen] = None
+        logger.info("TTS initialized with voice: %s (%s)", self.voice,
+                    "NSSpeechSynthesizer" if self._synth else "say")
+
+    def _create_synthesizer(self):
+        """Create an NSSpeechSynthesizer for self.voice, or None if unavailable."""
+        try:
+            voice_id = next(
+                (
+                    identifier for identifier in NSSpeechSynthesizer.availableVoices()
+                    if NSSpeechSynthesizer.attributesForVoice_(identifier).get("VoiceName") == self.voice
+                ),
+                None
+            )
+            if voice_id is None:
+                logger.warning("Voice %s not found, using say", self.voice)
+                return None
+            return NSSpeechSynthesizer.alloc().initWithVoice_(voice_id)
+        except Exception as e:
+            logger.warning("NSSpeechSynthesizer unavailable, using say: %s", e)
+            return None
+
+    def _speak_native(self, text: str, blocking: bool) -> bool:
+        """Speak with the in-process synthesizer, polling for completion."""
+        if not self._synth.startSpeakingString_(text):
+            logger.error("TTS error: synthesizer refused to speak")
+            return False
+        if blocking:
+            deadline = time.monotonic() + SPEAK_TIMEOUT
+            while self._synth.isSpeaking():
+                if time.monotonic() > deadline:
+                    self._synth.stopSpeaking()
+                    logger.error("TTS timeout")
+                    return False
+                time.sleep(SPEAK_POLL)
+        return True
+
+    def _spawn(self) -> Optional[subprocess.Popen]:
+        """Start a `say` process that waits for text on stdin."""
+        try:
+            return subprocess.Popen(
+                [resolve_command("say"), "-v", self.voice],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                close_fds=False
+            )
+        except OSError as e:
+            logger.error("Failed to start say: %s", e)
+            return None
+
+    def _take_process(self) -> Optional[subprocess.Popen]:
+        """Hand out the standby process and start its replacement."""
+        with self._lock:
+            proc = self._standby
+            if proc is None or proc.poll() is not None:  # e.g. killed by stop()
+                proc = self._spawn()
+                if proc is None:
+                    self._standby = None
+                    return None  # say cannot start: no standby either
+            self._standby = self._spawn()
+        return proc
+
+    def _is_repeat(self, text: str) -> bool:
+        """True if text was just started and is still playing or within REPEAT_WINDOW."""
+        if text != self._last_text:
+            return False
+        if time.monotonic() - self._last_at < REPEAT_WINDOW:
+            return True
+        if self._synth is not None:
+            return bool(self._synth.isSpeaking())
+        return self._last_proc is not None and self._last_proc.poll() is None
 
     def speak(self, text: str, blocking: bool = True) -> bool:
         """
@@ -30,41 +134,67 @@ class TTSEngine:
             blocking: If True, wait for speech to complete
 
         Returns:
-            True if successful
+            True if successful (a repeat of the text still being spoken is
+            skipped and counts as success)
         """
+        text = text.strip()
         if not text:
             return False
+        if self._is_repeat(text):
+            logger.debug("TTS skipped repeat: %s", text)
+            return True
 
         try:
-            logger.info(f"TTS speaking: {text}")
+            logger.info("TTS speaking: %s", text)
             print(f"\n🔊 {text}")
+            self._last_text, self._last_at = text, time.monotonic()
+
+            if self._synth is not None:
+                return self._speak_native(text, blocking)
 
-            cmd = ["say", "-v", self.voice, text]
+            proc = self._last_proc = self._take_process()
+            if proc is None:
+                return False
+
+            # Closing stdin is the end of input: say starts speaking
+            proc.stdin.write(text)
+            proc.stdin.close()
 
             if blocking:
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                return result.returncode == 0
-            else:
-                # Non-blocking
-                subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
-                return True
+                try:
+                    return proc.wait(timeout=SPEAK_TIMEOUT) == 0
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    raise
+            return True
 
         except subprocess.TimeoutExpired:
             logger.error("TTS timeout")
             return False
         except Exception as e:
-            logger.error(f"TTS error: {e}")
+            logger.error("TTS error: %s", e)
             return False
 
+    def warmup(self) -> None:
+        """Speak an empty string, loading the voice and audio output silently."""
+        if self._synth is not None:
+            return  # the voice was loaded when the synthesizer was created
+        try:
+            subprocess.run(
+                [resolve_command("say"), "-v", self.voice, ""],
+                capture_output=True, timeout=10, close_fds=False
+            )
+        except Exception as e:
+            logger.debug("TTS warmup failed: %s", e)
+
+    def close(self) -> None:
+        """Release the standby process (EOF with no text: it exits silently)."""
+        with self._lock:
+            proc, self._standby = self._standby, None
+        if proc is not None and proc.poll() is None:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+
     def stop(self) -> bool:
         """
         Stop current speech.
@@ -72,14 +202,97 @@ class TTSEngine:
         Returns:
             True if successful
         """
+        self._last_text = ""  # speaking the same text after a stop is deliberate
         try:
-            subprocess.run(["killall", "say"], check=False)
+            if self._synth is not None:
+                self._synth.stopSpeaking()
+                return True
+            subprocess.run(["killall", "say"], check=False)  # the standby is respawned on next use
             return True
         except Exception as e:
-            logger.error(f"Failed to stop TTS: {e}")
+            logger.error("Failed to stop TTS: %s", e)
             return False
 
 
+class TTSQueue:
+    """
+    Serializes speech on a background thread.
+    语音按顺序在后台线程播报 (utterances play in order, off the caller's thread).
+    """
+
+    def __init__(self, engine: TTSEngine):
+        """
+        Initialize TTS queue.
+
+        Args:
+            engine: TTS engine that does the speaking
+        """
+        self.engine = engine
+        self._queue: queue.Queue = queue.Queue()
+        self._worker = threading.Thread(target=self._drain, name="tts", daemon=True)
+        self._worker.start()
+
+    def _drain(self) -> None:
+        """Worker loop: speak queued utterances one at a time."""
+        while True:
+            text, done = self._queue.get()
+            if done is None:
+                self.engine.warmup()
+                continue
+            try:
+                done.set_result(self.engine.speak(text))
+            except Exception as e:
+                done.set_exception(e)
+
+    def speak_async(self, text: str) -> Future:
+        """
+        Queue text and return immediately.
+
+        Args:
+            text: Text to speak
+
+        Returns:
+            Future resolving to the engine's speak() result
+        """
+        done: Future = Future()
+        self._queue.put((text, done))
+        return done
+
+    def speak(self, text: str, blocking: bool = True) -> bool:
+        """
+        Speak text after any queued speech.
+
+        Args:
+            text: Text to speak
+            blocking: If True, wait for speech to complete
+
+        Returns:
+            True if successful (always True when not blocking)
+        """
+        done = self.speak_async(text)
+        return done.result() if blocking else True
+
+    def warmup(self) -> None:
+        """Warm up the engine on the worker thread; speech queued later waits for it."""
+        self._queue.put(("", None))
+
+    def stop(self) -> bool:
+        """Drop queued speech and stop the current utterance."""
+        while True:
+            try:
+                _, done = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if done is not None:
+                done.set_result(False)
+        return self.engine.stop()
+
+
 def create_tts_engine(voice: Optional[str] = None) -> TTSEngine:
     """Factory function to create TTS engine."""
     return TTSEngine(voice=voice)
+
+
+def create_tts_queue(voice: Optional[str] = None) -> TTSQueue:
+    """Factory function to create a queued TTS engine."""
+    return TTSQueue(create_tts_engine(voice=voice))
@@ -1,21 +1,61 @@
 """
-Utility functions for AppleScript execution and logging.
+Utility functions for AppleScript execution, logging and JSON parsing.
 """
+import json
 import logging
+import queue
+import shlex
+import shutil
 import subprocess
-from typing import Tuple
+import threading
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
 from pathlib import Path
 
+try:
+    import orjson  # optional C-backed parser/serializer
+
+    json_loads = orjson.loads
+
+    def json_dumps(obj) -> str:
+        """Serialize obj to compact JSON, keeping non-ASCII text as-is."""
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    from json import loads as json_loads
+
+    def json_dumps(obj) -> str:
+        """Serialize obj to compact JSON, keeping non-ASCII text as-is."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
 from .config import config
 
 
-# Setup logging
+# Setup logging; the level is resolved once (unknown names fall back to INFO)
+LOG_LEVEL = logging.getLevelName(config.LOG_LEVEL.upper())
+if not isinstance(LOG_LEVEL, int):
+    LOG_LEVEL = logging.INFO
+
 logging.basicConfig(
-    level=getattr(logging, config.LOG_LEVEL),
+    level=LOG_LEVEL,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# Never let a logging failure (closed stream, bad record) interrupt a turn
+logging.raiseExceptions = False
+
+
+@lru_cache(maxsize=None)
+def resolve_command(name: str) -> str:
+    """
+    Absolute path of a command on PATH (name unchanged if not found).
+
+    Popen takes its posix_spawn fast path, with no fork of this process,
+    only for an executable given with a directory and close_fds=False.
+    Our own descriptors are non-inheritable (PEP 446), so nothing leaks.
+    """
+    return shutil.which(name) or name
+
 
 def run_osascript(script_path: Path, *args) -> Tuple[bool, str, str]:
     """
@@ -29,14 +69,16 @@ def run_osascript(script_path: Path, *args) -> Tuple[bool, str, str]:
         (success, stdout, stderr)
     """
     try:
-        cmd = ["osascript", str(script_path)] + [str(arg) for arg in args]
-        logger.debug(f"Running: {' '.join(cmd)}")
+        cmd = [resolve_command("osascript"), str(script_path)] + [str(arg) for arg in args]
+        if LOG_LEVEL <= logging.DEBUG:
+            logger.debug("Running: %s", ' '.join(cmd))
 
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
-            timeout=30
+            timeout=30,
+            close_fds=False
         )
 
         success = result.returncode == 0
@@ -44,9 +86,9 @@ def run_osascript(script_path: Path, *args) -> Tuple[bool, str, str]:
         stderr = result.stderr.strip()
 
         if success:
-            logger.info(f"AppleScript executed successfully: {stdout}")
+            logger.info("AppleScript executed successfully: %s", stdout)
         else:
-            logger.error(f"AppleScript failed: {stderr}")
+            logger.error("AppleScript failed: %s", stderr)
 
         return success, stdout, stderr
 
@@ -54,30 +96,205 @@ def run_osascript(script_path: Path, *args) -> Tuple[bool, str, str]:
         logger.error("AppleScript execution timed out")
         return False, "", "Timeout after 30 seconds"
     except Exception as e:
-        logger.error(f"AppleScript execution error: {e}")
+        logger.error("AppleScript execution error: %s", e)
         return False, "", str(e)
 
 
-def run_shell_command(cmd: str) -> Tuple[bool, str, str]:
+def compile_applescript(source_path: Path) -> Path:
     """
-    Execute shell command.
+    Compile an .applescript file to a sibling .scpt if missing or stale.
 
     Args:
-        cmd: Shell command string
+        source_path: Path to .applescript file
 
     Returns:
-        (success, stdout, stderr)
+        Path to the .scpt, or source_path if osacompile is unavailable or fails
     """
+    compiled_path = source_path.with_suffix(".scpt")
     try:
-        logger.debug(f"Running shell: {cmd}")
+        if compiled_path.stat().st_mtime >= source_path.stat().st_mtime:
+            return compiled_path
+    except FileNotFoundError:
+        pass
+
+    if shutil.which("osacompile") is None:
+        return source_path
 
+    try:
         result = subprocess.run(
-            cmd,
-            shell=True,
+            ["osacompile", "-o", str(compiled_path), str(source_path)],
             capture_output=True,
             text=True,
             timeout=30
         )
+    except Exception as e:
+        logger.warning("osacompile error for %s: %s", source_path.name, e)
+        return source_path
+
+    if result.returncode != 0:
+        logger.warning("osacompile failed for %s: %s", source_path.name, result.stderr.strip())
+        return source_path
+
+    logger.debug("Compiled %s", compiled_path.name)
+    return compiled_path
+
+
+class OsascriptSession:
+    """
+    Long-lived osascript child that runs AppleScript without a fork per call.
+
+    The child runs executor/macos/osa_host.js, which reads one JSON request
+    per line on stdin and answers with one JSON line on stdout. The process
+    is started on first use and restarted if it dies.
+    """
+
+    def __init__(self, host_script: Path, timeout: float = 30):
+        """
+        Initialize session.
+
+        Args:
+            host_script: Path to osa_host.js
+            timeout: Seconds to wait for each reply
+        """
+        self.host_script = host_script
+        self.timeout = timeout
+        self._proc: Optional[subprocess.Popen] = None
+        self._replies: Optional[queue.Queue] = None
+        self._lock = threading.Lock()
+        # True if the last request failed because the host could not be
+        # started or exited before replying (safe to retry elsewhere); a
+        # timeout leaves it False, as the script may still have run
+        self.unavailable = False
+
+    def _ensure_started(self) -> subprocess.Popen:
+        """Start the host process if it is not running."""
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                [resolve_command("osascript"), "-l", "JavaScript", str(self.host_script)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+                close_fds=False
+            )
+            # A reader thread lets run() wait for a reply with a timeout
+            self._replies = queue.Queue()
+            threading.Thread(
+                target=self._read_replies,
+                args=(self._proc, self._replies),
+                daemon=True
+            ).start()
+            logger.info("Started osascript session")
+        return self._proc
+
+    @staticmethod
+    def _read_replies(proc: subprocess.Popen, replies: queue.Queue) -> None:
+        for line in proc.stdout:
+            replies.put(line)
+        replies.put(None)  # EOF: host exited
+
+    def run(self, source: str, *args) -> Tuple[bool, str, str]:
+        """
+        Run AppleScript source; args are passed to its run handler as argv.
+
+        Args:
+            source: AppleScript source code
+            *args: Arguments to pass to the script
+
+        Returns:
+            (success, stdout, stderr)
+        """
+        return self._request({"source": source, "args": [str(arg) for arg in args]})
+
+    def run_file(self, script_path: Path, *args) -> Tuple[bool, str, str]:
+        """
+        Run an AppleScript file (.scpt or .applescript) with arguments.
+
+        Args:
+            script_path: Path to script file
+            *args: Arguments to pass to the script
+
+        Returns:
+            (success, stdout, stderr)
+        """
+        return self._request({"path": str(script_path), "args": [str(arg) for arg in args]})
+
+    def _request(self, payload: dict) -> Tuple[bool, str, str]:
+        """Send one request to the host and wait for its reply."""
+        request = json.dumps(payload)  # ensure_ascii: the host reads ASCII-only lines
+
+        with self._lock:
+            self.unavailable = False
+            try:
+                proc = self._ensure_started()
+                proc.stdin.write(request + "\n")
+                proc.stdin.flush()
+                line = self._replies.get(timeout=self.timeout)
+            except queue.Empty:
+                logger.error("AppleScript execution timed out")
+                self.close()
+                return False, "", f"Timeout after {self.timeout} seconds"
+            except Exception as e:
+                logger.error("AppleScript session error: %s", e)
+                self.close()
+                self.unavailable = True
+                return False, "", str(e)
+
+        if line is None:
+            self._proc = None
+            self.unavailable = True
+            logger.error("AppleScript session exited unexpectedly")
+            return False, "", "osascript session exited"
+
+        reply = json_loads(line)
+        if reply.get("ok"):
+            stdout = reply.get("out", "").strip()
+            logger.info("AppleScript executed successfully: %s", stdout)
+            return True, stdout, ""
+
+        stderr = reply.get("err", "").strip()
+        logger.error("AppleScript failed: %s", stderr)
+        return False, "", stderr
+
+    @property
+    def running(self) -> bool:
+        """True if the host process is alive."""
+        return self._proc is not None and self._proc.poll() is None
+
+    def close(self) -> None:
+        """Stop the host process."""
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+def run_shell_command(cmd: Union[str, List[str]]) -> Tuple[bool, str, str]:
+    """
+    Execute a command without an intermediate shell.
+
+    Args:
+        cmd: argv list, or a command string split with shlex
+             (quoting is honoured; pipes, globs and variables are not)
+
+    Returns:
+        (success, stdout, stderr)
+    """
+    try:
+        logger.debug("Running shell: %s", cmd)
+        argv = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+        if argv:
+            argv[0] = resolve_command(argv[0])
+
+        result = subprocess.run(
+            argv,
+            capture_output=True,
+            text=True,
+            timeout=30,
+            close_fds=False
+        )
 
         success = result.returncode == 0
         stdout = result.stdout.strip()
@@ -86,5 +303,5 @@ def run_shell_command(cmd: str) -> Tuple[bool, str, str]:
         return success, stdout, stderr
 
     except Exception as e:
-        logger.error(f"Shell command error: {e}")
+        logger.error("Shell command error: %s", e)
         return False, "", str(e)
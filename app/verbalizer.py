@@ -2,11 +2,37 @@
 Verbalizer generates natural language responses for TTS.
 Converts intent execution results into user-friendly speech.
 """
-from typing import Dict, Any
+from typing import Callable, Dict
 
 from .schema import Intent, ExecutionResult
 
 
+# Default confirmation per intent, built from its slots (used when the
+# intent has no speak_back)
+_CONFIRM_BUILDERS: Dict[str, Callable[[dict], str]] = {
+    "system_setting": lambda s: f"好的，正在调整{s.get('setting', '设置')}到{s.get('value', '')}",
+    "play_music": lambda s: f"好的，{s.get('action', '播放')}{s.get('query', '音乐')}",
+    "web_search": lambda s: f"好的，帮您搜索{s.get('query', '内容')}",
+    "write_note": lambda s: f"好的，正在创建笔记：{s.get('title', '笔记')}",
+    "control_app": lambda s: f"好的，{s.get('action', '打开')}{s.get('app', '应用')}",
+    "clarify": lambda s: "抱歉，我没理解您的意思",
+}
+
+
+def _default_confirmation(slots: dict) -> str:
+    return "好的，正在执行"
+
+
+# Spoken after a successful execution
+_SUCCESS_MSGS: Dict[str, str] = {
+    "system_setting": "设置已完成",
+    "play_music": "已为您播放",
+    "web_search": "已打开搜索结果",
+    "write_note": "笔记已创建",
+    "control_app": "操作已完成",
+}
+
+
 class Verbalizer:
     """Generate natural language responses from intents and results."""
 
@@ -20,41 +46,8 @@ class Verbalizer:
         Returns:
             Confirmation text
         """
-        # Use speak_back from intent if available
-        if intent.speak_back:
-            return intent.speak_back
-
-        # Generate default confirmation
-        intent_name = intent.intent
-        slots = intent.slots
-
-        if intent_name == "system_setting":
-            setting = slots.get("setting", "设置")
-            value = slots.get("value", "")
-            return f"好的，正在调整{setting}到{value}"
-
-        elif intent_name == "play_music":
-            action = slots.get("action", "播放")
-            query = slots.get("query", "音乐")
-            return f"好的，{action}{query}"
-
-        elif intent_name == "web_search":
-            query = slots.get("query", "内容")
-            return f"好的，帮您搜索{query}"
-
-        elif intent_name == "write_note":
-            title = slots.get("title", "笔记")
-            return f"好的，正在创建笔记：{title}"
-
-        elif intent_name == "control_app":
-            app = slots.get("app", "应用")
-            action = slots.get("action", "打开")
-            return f"好的，{action}{app}"
-
-        elif intent_name == "clarify":
-            return intent.speak_back or "抱歉，我没理解您的意思"
-
-        return "好的，正在执行"
+        # Use speak_back from intent if available, else the per-intent default
+        return intent.speak_back or _CONFIRM_BUILDERS.get(intent.intent, _default_confirmation)(intent.slots)
 
     def generate_result_message(self, intent: Intent, result: ExecutionResult) -> str:
         """
@@ -74,24 +67,7 @@ class Verbalizer:
 
     def _success_message(self, intent: Intent, result: ExecutionResult) -> str:
         """Generate success message."""
-        intent_name = intent.intent
-
-        if intent_name == "system_setting":
-            return "设置已完成"
-
-        elif intent_name == "play_music":
-            return "已为您播放"
-
-        elif intent_name == "web_search":
-            return "已打开搜索结果"
-
-        elif intent_name == "write_note":
-            return "笔记已创建"
-
-        elif intent_name == "control_app":
-            return "操作已完成"
-
-        return "操作成功"
+        return _SUCCESS_MSGS.get(intent.intent, "操作成功")
 
     def _error_message(self, intent: Intent, result: ExecutionResult) -> str:
         """Generate error message."""
@@ -0,0 +1,53 @@
+// Long-lived AppleScript host for the executor
+// Usage: osascript -l JavaScript osa_host.js
+//
+// Reads one JSON request per stdin line:  {"source": "...", "args": [...]}
+//                                         {"path": "/abs/script.scpt", "args": [...]}
+// Writes one JSON reply per stdout line:  {"ok": true, "out": "..."}
+//                                         {"ok": false, "err": "..."}
+// Requests are ASCII-only JSON, so a chunk never splits a UTF-8 sequence.
+
+ObjC.import("Foundation");
+
+function run() {
+	const app = Application.currentApplication();
+	app.includeStandardAdditions = true;
+
+	const stdin = $.NSFileHandle.fileHandleWithStandardInput;
+	const stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+	let buffer = "";
+
+	function reply(obj) {
+		const line = JSON.stringify(obj) + "\n";
+		stdout.writeData($(line).dataUsingEncoding($.NSUTF8StringEncoding));
+	}
+
+	while (true) {
+		const data = stdin.availableData;
+		if (data.length === 0) {
+			break;  // EOF: the assistant exited
+		}
+		buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+
+		let newline;
+		while ((newline = buffer.indexOf("\n")) >= 0) {
+			const line = buffer.slice(0, newline);
+			buffer = buffer.slice(newline + 1);
+			if (!line.trim()) {
+				continue;
+			}
+
+			try {
+				const request = JSON.parse(line);
+				const script = request.path ? Path(request.path) : request.source;
+				const out = app.runScript(script, {
+					withParameters: request.args || [],
+					in: "AppleScript"
+				});
+				reply({ok: true, out: out === undefined || out === null ? "" : String(out)});
+			} catch (e) {
+				reply({ok: false, err: String(e)});
+			}
+		}
+	}
+}
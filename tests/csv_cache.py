@@ -0,0 +1,44 @@
+"""
+On-disk cache of parsed replay CSVs.
+Parsed rows are pickled next to the CSV and reused while the CSV's
+mtime and size are unchanged.
+"""
+import pickle
+from pathlib import Path
+from typing import Callable, List, Sequence
+
+# Bump when a loader's row layout changes
+CACHE_VERSION = 1
+
+
+def load_cached(csv_path: Path, parse: Callable[[Path], Sequence[tuple]]) -> List[tuple]:
+    """
+    Return parse(csv_path), cached as plain tuples in <csv>.cache.
+
+    Rows are stored as builtin tuples, so the cache does not depend on the
+    record classes of the script that wrote it.
+
+    Args:
+        csv_path: CSV file
+        parse: Loader returning one tuple (or NamedTuple) per row
+
+    Returns:
+        Rows as plain tuples
+    """
+    stat = csv_path.stat()
+    key = (CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    cache_path = csv_path.with_suffix(csv_path.suffix + ".cache")
+
+    try:
+        cached_key, rows = pickle.loads(cache_path.read_bytes())
+        if cached_key == key:
+            return rows
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass  # missing or unreadable: parse again
+
+    rows = [tuple(row) for row in parse(csv_path)]
+    try:
+        cache_path.write_bytes(pickle.dumps((key, rows), protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        pass  # read-only checkout: just skip caching
+    return rows
@@ -9,12 +9,14 @@ Usage:
 import sys
 import csv
 from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple, Union
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.planner import create_planner
 from app.schema import Intent, Plan
+from csv_cache import load_cached
 from rich.console import Console
 from rich.table import Table
 from rich import print as rprint
@@ -22,21 +24,31 @@ from rich import print as rprint
 console = Console()
 
 
-def load_test_cases(csv_path: Path):
-    """Load test cases from CSV file."""
-    test_cases = []
+class PlanCase(NamedTuple):
+    """One row of plan_tasks.csv."""
+    utterance: str
+    expected_type: str
+    expected_steps: int
+    description: str
 
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            test_cases.append({
-                "utterance": row["utterance"],
-                "expected_type": row["expected_type"],
-                "expected_steps": int(row["expected_steps"]),
-                "description": row["description"]
-            })
 
-    return test_cases
+def load_test_cases(csv_path: Path) -> List[PlanCase]:
+    """Load test cases, reusing the parsed cache while the CSV is unchanged."""
+    return [PlanCase(*row) for row in load_cached(csv_path, _parse_test_cases)]
+
+
+def _parse_test_cases(csv_path: Path) -> List[PlanCase]:
+    """Parse test cases from CSV file (column order taken from the header)."""
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        idx = {column: i for i, column in enumerate(next(reader))}
+        utt_i, type_i, steps_i, desc_i = (
+            idx["utterance"], idx["expected_type"], idx["expected_steps"], idx["description"]
+        )
+        return [
+            PlanCase(row[utt_i], row[type_i], int(row[steps_i]), row[desc_i])
+            for row in reader if row
+        ]
 
 
 def test_multi_step_planning():
@@ -53,65 +65,72 @@ def test_multi_step_planning():
     console.print("[cyan]Initializing planner with LLM...[/cyan]")
     planner = create_planner(use_llm=True)
 
-    # Test results
+    # Test results; each distinct utterance is planned once
     results = []
+    planned: Dict[str, Tuple[str, Union[Intent, Plan]]] = {}
 
     for i, test in enumerate(test_cases, 1):
-        console.print(f"\n[bold]Test {i}/{len(test_cases)}:[/bold] {test['utterance']}")
-        console.print(f"[dim]Expected: {test['expected_type']} with {test['expected_steps']} step(s)[/dim]")
+        # Buffer this test's lines and render them in one print
+        lines = [
+            f"\n[bold]Test {i}/{len(test_cases)}:[/bold] {test.utterance}",
+            f"[dim]Expected: {test.expected_type} with {test.expected_steps} step(s)[/dim]",
+        ]
 
         try:
             # Parse
-            result = planner.parse_plan_or_intent(test["utterance"], dry_run=False)
+            if test.utterance not in planned:
+                planned[test.utterance] = planner.parse_plan_or_intent(test.utterance, dry_run=False)
+            actual_type, result = planned[test.utterance]
 
             # Check type
-            actual_type = "plan" if isinstance(result, Plan) else "intent"
-            type_match = actual_type == test["expected_type"]
+            type_match = actual_type == test.expected_type
 
             # Check steps
-            if isinstance(result, Plan):
+            if actual_type == "plan":
                 actual_steps = len(result.plan)
-                steps_match = actual_steps == test["expected_steps"]
+                steps_match = actual_steps == test.expected_steps
 
-                console.print(f"[green]✓ Got Plan with {actual_steps} steps[/green]")
-                console.print(f"  Summary: {result.summary}")
+                lines.append(f"[green]✓ Got Plan with {actual_steps} steps[/green]")
+                lines.append(f"  Summary: {result.summary}")
 
                 for j, intent in enumerate(result.plan, 1):
-                    console.print(f"  Step {j}: [{intent.intent}] {intent.slots}")
+                    lines.append(f"  Step {j}: [{intent.intent}] {intent.slots}")
             else:
                 actual_steps = 1
-                steps_match = actual_steps == test["expected_steps"]
+                steps_match = actual_steps == test.expected_steps
 
-                console.print(f"[yellow]Got Intent: [{result.intent}] {result.slots}[/yellow]")
+                lines.append(f"[yellow]Got Intent: [{result.intent}] {result.slots}[/yellow]")
 
             # Overall result
             passed = type_match and steps_match
 
             results.append({
-                "utterance": test["utterance"],
-                "expected_type": test["expected_type"],
+                "utterance": test.utterance,
+                "expected_type": test.expected_type,
                 "actual_type": actual_type,
-                "expected_steps": test["expected_steps"],
+                "expected_steps": test.expected_steps,
                 "actual_steps": actual_steps,
                 "passed": passed
             })
 
             if passed:
-                console.print("[bold green]✓ PASS[/bold green]")
+                lines.append("[bold green]✓ PASS[/bold green]")
             else:
-                console.print(f"[bold red]✗ FAIL[/bold red] - Type match: {type_match}, Steps match: {steps_match}")
+                lines.append(f"[bold red]✗ FAIL[/bold red] - Type match: {type_match}, Steps match: {steps_match}")
 
         except Exception as e:
-            console.print(f"[bold red]✗ ERROR: {e}[/bold red]")
+            lines.append(f"[bold red]✗ ERROR: {e}[/bold red]")
             results.append({
-                "utterance": test["utterance"],
-                "expected_type": test["expected_type"],
+                "utterance": test.utterance,
+                "expected_type": test.expected_type,
                 "actual_type": "error",
-                "expected_steps": test["expected_steps"],
+                "expected_steps": test.expected_steps,
                 "actual_steps": 0,
                 "passed": False
             })
 
+        console.print("\n".join(lines))
+
     # Summary
     console.print("\n" + "=" * 80 + "\n")
     console.print("[bold cyan]Test Summary[/bold cyan]\n")
@@ -148,11 +167,13 @@ def test_multi_step_planning():
     total = len(results)
     pass_rate = (passed_count / total * 100) if total > 0 else 0
 
-    console.print(f"\n[bold]Overall Results:[/bold]")
-    console.print(f"  Total: {total}")
-    console.print(f"  Passed: [green]{passed_count}[/green]")
-    console.print(f"  Failed: [red]{total - passed_count}[/red]")
-    console.print(f"  Pass Rate: [{'green' if pass_rate >= 80 else 'yellow'}]{pass_rate:.1f}%[/]")
+    console.print("\n".join([
+        "\n[bold]Overall Results:[/bold]",
+        f"  Total: {total}",
+        f"  Passed: [green]{passed_count}[/green]",
+        f"  Failed: [red]{total - passed_count}[/red]",
+        f"  Pass Rate: [{'green' if pass_rate >= 80 else 'yellow'}]{pass_rate:.1f}%[/]",
+    ]))
 
     if pass_rate >= 80:
         console.print("\n[bold green]✓ Test suite PASSED[/bold green]")
@@ -4,16 +4,18 @@ Test replay script.
 Reads tasks from CSV and evaluates planner accuracy.
 """
 import csv
-import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, FrozenSet, List, NamedTuple, Optional, Tuple
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.planner import create_planner
 from app.config import config
+from app.utils import json_loads
+from csv_cache import load_cached
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -21,25 +23,64 @@ from rich.panel import Panel
 
 console = Console()
 
+# Concurrent planner calls in LLM mode (network bound)
+LLM_WORKERS = 8
+
+
+class Task(NamedTuple):
+    """One row of tasks.csv."""
+    utterance: str
+    expected_intent: str
+    expected_slots: Dict[str, Any]
+    expected_slots_lc: Dict[str, Any]       # string values lowercased
+    expected_query_words: FrozenSet[str]    # lowercased words of the query slot
+
+
+class TaskResult(NamedTuple):
+    """One failed task, as listed under Failed Cases."""
+    index: int
+    utterance: str
+    expected_intent: str = ""
+    predicted_intent: str = ""
+    expected_slots: Optional[Dict[str, Any]] = None
+    predicted_slots: Optional[Dict[str, Any]] = None
+    intent_match: bool = False
+    slots_match: bool = False
+    slots_reason: str = ""
+    error: Optional[str] = None             # set when the planner raised
+
+
+def _parse_slots(raw: str) -> Dict[str, Any]:
+    """Parse the expected_slots column; malformed JSON means no slots."""
+    try:
+        return json_loads(raw)
+    except ValueError:
+        return {}
+
+
+def _make_task(utterance: str, expected_intent: str, slots: Dict[str, Any]) -> Task:
+    """Build a Task with the comparison forms of its slots precomputed."""
+    slots_lc = {k: v.lower() if isinstance(v, str) else v for k, v in slots.items()}
+    query = slots_lc.get('query')
+    query_words = frozenset(query.split()) if isinstance(query, str) else frozenset()
+    return Task(utterance, expected_intent, slots, slots_lc, query_words)
 
-def load_tasks(csv_path: Path) -> List[Dict[str, Any]]:
-    """Load test tasks from CSV file."""
-    tasks = []
-    with open(csv_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Parse expected slots
-            try:
-                slots = json.loads(row['expected_slots'])
-            except json.JSONDecodeError:
-                slots = {}
 
-            tasks.append({
-                'utterance': row['utterance'],
-                'expected_intent': row['expected_intent'],
-                'expected_slots': slots
-            })
-    return tasks
+def load_tasks(csv_path: Path) -> List[Task]:
+    """Load test tasks, reusing the parsed cache while the CSV is unchanged."""
+    return [Task(*row) for row in load_cached(csv_path, _parse_tasks)]
+
+
+def _parse_tasks(csv_path: Path) -> List[Task]:
+    """Parse test tasks from CSV file (column order taken from the header)."""
+    with open(csv_path, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        idx = {column: i for i, column in enumerate(next(reader))}
+        utt_i, intent_i, slots_i = idx['utterance'], idx['expected_intent'], idx['expected_slots']
+        return [
+            _make_task(row[utt_i], row[intent_i], _parse_slots(row[slots_i]))
+            for row in reader if row
+        ]
 
 
 def evaluate_intent(predicted: str, expected: str) -> bool:
@@ -47,10 +88,21 @@ def evaluate_intent(predicted: str, expected: str) -> bool:
     return predicted == expected
 
 
-def evaluate_slots(predicted: Dict, expected: Dict) -> Tuple[bool, str]:
+def evaluate_slots(
+    predicted: Dict,
+    expected: Dict,
+    expected_lc: Optional[Dict] = None,
+    expected_query_words: Optional[FrozenSet[str]] = None
+) -> Tuple[bool, str]:
     """
     Check if slots match (partial match allowed).
 
+    Args:
+        predicted: Predicted slots
+        expected: Expected slots
+        expected_lc, expected_query_words: Precomputed by _make_task;
+            derived from expected when omitted
+
     Returns:
         (match, reason)
     """
@@ -58,6 +110,10 @@ def evaluate_slots(predicted: Dict, expected: Dict) -> Tuple[bool, str]:
         # No slots expected, any result is OK
         return True, ""
 
+    if expected_lc is None or expected_query_words is None:
+        task = _make_task("", "", expected)
+        expected_lc, expected_query_words = task.expected_slots_lc, task.expected_query_words
+
     # Check key slots
     for key, value in expected.items():
         if key not in predicted:
@@ -74,12 +130,12 @@ def evaluate_slots(predicted: Dict, expected: Dict) -> Tuple[bool, str]:
 
         # Partial string match
         if isinstance(value, str) and isinstance(pred_value, str):
-            if value.lower() not in pred_value.lower() and pred_value.lower() not in value.lower():
+            value_lc = expected_lc[key]
+            pred_lc = pred_value.lower()
+            if value_lc not in pred_lc and pred_lc not in value_lc:
                 # For search queries, just check if some words match
                 if key == "query":
-                    value_words = set(value.lower().split())
-                    pred_words = set(pred_value.lower().split())
-                    if not value_words & pred_words:  # No overlap
+                    if expected_query_words.isdisjoint(pred_lc.split()):  # No overlap
                         return False, f"Slot {key}: no word overlap"
                 else:
                     return False, f"Slot {key}: value mismatch"
@@ -126,15 +182,29 @@ def run_tests(use_llm: bool = False):
     both_correct = 0
     errors = []
 
+    # Each distinct utterance is planned once per run. LLM calls are
+    # submitted up front and collected in order (dry_run=False, or the
+    # planner never consults the LLM); rule-based planning takes
+    # microseconds per task and runs inline
+    pool = ThreadPoolExecutor(max_workers=max(1, min(LLM_WORKERS, total))) if use_llm else None
+    planned: Dict[str, Any] = {}  # utterance -> Future (LLM) or Intent (rules)
+    if pool:
+        for task in tasks:
+            if task.utterance not in planned:
+                planned[task.utterance] = pool.submit(planner.plan, task.utterance, False)
+
     # Run tests
     for i, task in enumerate(tasks, 1):
-        utterance = task['utterance']
-        expected_intent = task['expected_intent']
-        expected_slots = task['expected_slots']
+        utterance, expected_intent, expected_slots = task[:3]
 
         try:
-            # Plan (dry-run mode)
-            result = planner.plan(utterance, dry_run=True)
+            # Plan (nothing is executed either way)
+            if pool:
+                result = planned[utterance].result(timeout=30)
+            else:
+                result = planned.get(utterance)
+                if result is None:
+                    result = planned[utterance] = planner.plan(utterance, dry_run=True)
 
             # Evaluate intent
             intent_match = evaluate_intent(result.intent, expected_intent)
@@ -142,7 +212,9 @@ def run_tests(use_llm: bool = False):
                 intent_correct += 1
 
             # Evaluate slots
-            slots_match, slots_reason = evaluate_slots(result.slots, expected_slots)
+            slots_match, slots_reason = evaluate_slots(
+                result.slots, expected_slots, task.expected_slots_lc, task.expected_query_words
+            )
             if slots_match:
                 slots_correct += 1
 
@@ -151,17 +223,11 @@ def run_tests(use_llm: bool = False):
                 both_correct += 1
             else:
                 # Record error
-                errors.append({
-                    'index': i,
-                    'utterance': utterance,
-                    'expected_intent': expected_intent,
-                    'predicted_intent': result.intent,
-                    'expected_slots': expected_slots,
-                    'predicted_slots': result.slots,
-                    'intent_match': intent_match,
-                    'slots_match': slots_match,
-                    'slots_reason': slots_reason
-                })
+                errors.append(TaskResult(
+                    i, utterance, expected_intent, result.intent,
+                    expected_slots, result.slots,
+                    intent_match, slots_match, slots_reason
+                ))
 
             # Progress
             if i % 10 == 0:
@@ -169,11 +235,10 @@ def run_tests(use_llm: bool = False):
 
         except Exception as e:
             console.print(f"[red]Error on task {i}: {e}[/red]")
-            errors.append({
-                'index': i,
-                'utterance': utterance,
-                'error': str(e)
-            })
+            errors.append(TaskResult(i, utterance, error=str(e)))
+
+    if pool:
+        pool.shutdown(cancel_futures=True)
 
     # Display results
     console.print("\n")
@@ -197,26 +262,26 @@ def run_tests(use_llm: bool = False):
         table.add_column("Issue", width=25)
 
         for err in errors[:10]:  # Show first 10 errors
-            if 'error' in err:
+            if err.error is not None:
                 table.add_row(
-                    str(err['index']),
-                    err['utterance'][:30],
+                    str(err.index),
+                    err.utterance[:30],
                     "-",
                     "-",
-                    f"[red]Error: {err['error'][:20]}[/red]"
+                    f"[red]Error: {err.error[:20]}[/red]"
                 )
             else:
                 issue = []
-                if not err['intent_match']:
-                    issue.append(f"intent: {err['expected_intent']} ≠ {err['predicted_intent']}")
-                if not err['slots_match']:
-                    issue.append(f"slots: {err['slots_reason']}")
+                if not err.intent_match:
+                    issue.append(f"intent: {err.expected_intent} ≠ {err.predicted_intent}")
+                if not err.slots_match:
+                    issue.append(f"slots: {err.slots_reason}")
 
                 table.add_row(
-                    str(err['index']),
-                    err['utterance'][:30],
-                    err['expected_intent'],
-                    err['predicted_intent'],
+                    str(err.index),
+                    err.utterance[:30],
+                    err.expected_intent,
+                    err.predicted_intent,
                     "; ".join(issue)[:25]
                 )
 